@@ -0,0 +1,161 @@
+"""
+无界面批量渲染
+
+不依赖cv2.imshow/cv2.waitKey，把各个场景渲染为PNG或NPY文件，并用进程池并行渲染。
+
+示例：
+    python batch_render.py ellipse_animation --indices 0:31 --out frames -j 8
+    python batch_render.py quintuple_asymmetric_ellipses --params a.json b.json --format npy
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+# 场景名 -> (模块名, 参数文件对应的渲染函数名)
+SCENES = {
+    'ellipse_animation': ('ellipse_animation', 'create_irregular_radial_gradient'),
+    'gradient_rings': ('gradient_rings', 'create_ring_gradient'),
+    'eccentric_ring': ('eccentric_ring', 'create_eccentric_ring_gradient'),
+    'triple_eccentric_rings': ('triple_eccentric_rings', 'create_triple_eccentric_ring_gradient'),
+    'quintuple_eccentric_ellipses': ('quintuple_eccentric_ellipses', 'create_quintuple_eccentric_ellipse_gradient'),
+    'quintuple_asymmetric_ellipses': ('quintuple_asymmetric_ellipses', 'create_asymmetric_ellipse_gradient'),
+}
+
+
+def render_scene(scene, index=None, params=None):
+    """渲染一帧场景图像
+
+    Args:
+        scene: SCENES中的场景名
+        index: ellipse_animation的组索引 (0 到 len(ellipse_sets)-1)
+        params: 传给场景渲染函数的关键字参数；为None时使用场景自带的draw_frame
+    """
+    module_name, kernel_name = SCENES[scene]
+    module = importlib.import_module(module_name)
+    if params is not None:
+        return getattr(module, kernel_name)(**params)
+    if scene == 'ellipse_animation':
+        if index is None:
+            index = len(module.ellipse_sets) // 2
+        return module.create_irregular_radial_gradient(
+            module.canvas_width,
+            module.canvas_height,
+            module.build_ellipse_params(module.ellipse_sets[index])
+        )
+    return module.draw_frame()
+
+
+def to_uint8(frame):
+    """把渲染结果转换为可以写入PNG的uint8图像，浮点图像按0-1映射到0-255"""
+    if frame.dtype == np.uint8:
+        return frame
+    return np.clip(frame * 255 + 0.5, 0, 255).astype(np.uint8)
+
+
+def render_job(job):
+    """在工作进程中渲染一帧并写入文件，返回 (输出路径, 渲染耗时)"""
+    start = time.perf_counter()
+    frame = render_scene(job['scene'], job.get('index'), job.get('params'))
+    elapsed = time.perf_counter() - start
+    if job['format'] == 'npy':
+        np.save(job['path'], frame)
+    else:
+        cv2.imwrite(job['path'], to_uint8(frame))
+    return job['path'], elapsed
+
+
+def parse_indices(text, count):
+    """解析 "5"、"0:31"、"0:31:2" 形式的索引范围，格式错误或越界时抛出ValueError"""
+    if ':' not in text:
+        index = int(text)
+        if not 0 <= index < count:
+            raise ValueError(f"index {index} out of range 0..{count - 1}")
+        return [index]
+    parts = [int(part) if part else None for part in text.split(':')]
+    return list(range(count))[slice(*parts)]
+
+
+def build_jobs(scene, indices, param_files, out_dir, fmt):
+    """生成渲染任务列表"""
+    jobs = []
+    if param_files:
+        for path in param_files:
+            with open(path, encoding='utf-8') as f:
+                params = json.load(f)
+            name = os.path.splitext(os.path.basename(path))[0]
+            jobs.append({
+                'scene': scene,
+                'params': params,
+                'format': fmt,
+                'path': os.path.join(out_dir, f'{scene}_{name}.{fmt}'),
+            })
+    elif scene == 'ellipse_animation':
+        for index in indices:
+            jobs.append({
+                'scene': scene,
+                'index': index,
+                'format': fmt,
+                'path': os.path.join(out_dir, f'{scene}_{index:04d}.{fmt}'),
+            })
+    else:
+        jobs.append({
+            'scene': scene,
+            'format': fmt,
+            'path': os.path.join(out_dir, f'{scene}.{fmt}'),
+        })
+    return jobs
+
+
+def run_jobs(jobs, workers):
+    """执行渲染任务，workers<=1时在当前进程内顺序执行；返回总耗时(秒)"""
+    start = time.perf_counter()
+    if workers <= 1:
+        for job in jobs:
+            render_job(job)
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(render_job, jobs, chunksize=chunksize):
+                pass
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render gradient scenes to PNG/NPY without a display.')
+    parser.add_argument('scene', choices=sorted(SCENES))
+    parser.add_argument('--indices', default=None,
+                        help='set indices for ellipse_animation, e.g. "5", "0:31" or "0:31:2" (default: all)')
+    parser.add_argument('--params', nargs='+', default=None,
+                        help='JSON files with keyword arguments for the scene kernel, one frame per file')
+    parser.add_argument('--format', choices=('png', 'npy'), default='png')
+    parser.add_argument('--out', default='render_output', help='output directory')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes')
+    args = parser.parse_args(argv)
+
+    indices = []
+    if args.scene == 'ellipse_animation' and not args.params:
+        from ellipse_data import ellipse_sets
+        try:
+            indices = parse_indices(args.indices or ':', len(ellipse_sets))
+        except ValueError as error:
+            parser.error(f"--indices: {error}")
+
+    os.makedirs(args.out, exist_ok=True)
+    jobs = build_jobs(args.scene, indices, args.params, args.out, args.format)
+    workers = max(1, min(args.workers, len(jobs)))
+    elapsed = run_jobs(jobs, workers)
+
+    fps = len(jobs) / elapsed if elapsed > 0 else float('inf')
+    print(f"Rendered {len(jobs)} frames with {workers} workers "
+          f"in {elapsed:.3f}s ({fps:.1f} frames/s) -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""
+渐变渲染函数的基准测试
+
+对每个渲染函数在不同画布尺寸和环数下计时，记录耗时与峰值内存到JSON文件，
+并可与保存的基线比较，发现变慢的改动。比较使用受干扰最小的最短耗时(min_s)，
+只有变慢的比例同时超过阈值和两次测量各自的波动(spread)时才报告退化。
+
+示例：
+    python benchmark.py --output results.json
+    python benchmark.py --quick --baseline baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from ellipse_animation import create_irregular_radial_gradient
+from eccentric_ring import create_eccentric_ring_gradient
+from gradient_rings import create_ring_gradient
+from quintuple_asymmetric_ellipses import create_asymmetric_ellipse_gradient
+from quintuple_eccentric_ellipses import create_quintuple_eccentric_ellipse_gradient
+from triple_eccentric_rings import create_triple_eccentric_ring_gradient
+
+# (宽, 高)
+SIZES = [(320, 80), (640, 480), (1000, 800), (1920, 1080), (3840, 2160)]
+RING_COUNTS = [1, 2, 5, 16, 64]
+
+QUICK_SIZES = [(320, 80), (1000, 800)]
+QUICK_RING_COUNTS = [1, 5, 16]
+
+# 每个用例至少计时的总时长(秒)与重复次数范围
+MIN_TIME = 0.2
+MIN_REPEATS = 5
+MAX_REPEATS = 50
+
+# 最短耗时比基线慢超过该比例（且超过测量波动）即视为退化
+DEFAULT_THRESHOLD = 0.10
+
+
+def ring_layout(width, height, count):
+    """生成按画布缩放、从外到内排列的count个环参数
+
+    Returns:
+        (centers, axes_left, axes_right, axes_y, brightnesses)
+    """
+    t = np.linspace(0, 1, count) if count > 1 else np.zeros(1)
+    base_x, base_y = width / 2, height / 2
+    centers = [(base_x + 0.05 * width * k, base_y + 0.05 * height * k) for k in t]
+    axes_y = [0.4 * height * (1 - 0.8 * k) for k in t]
+    axes_left = [0.4 * width * (1 - 0.8 * k) for k in t]
+    axes_right = [0.3 * width * (1 - 0.8 * k) for k in t]
+    brightnesses = [0.9 - 0.8 * k for k in t]
+    return centers, axes_left, axes_right, axes_y, brightnesses
+
+
+def irregular_case(width, height, count):
+    centers, axes_left, axes_right, axes_y, _ = ring_layout(width, height, count)
+    # create_irregular_radial_gradient的椭圆从内到外排列
+    ellipse_params = [
+        {
+            'center': center,
+            'axes_left': left,
+            'axes_right': right,
+            'axes_y': axis_y,
+            'value': 200 * (0.05 + 0.95 * k / max(count - 1, 1))
+        }
+        for k, (center, left, right, axis_y) in enumerate(zip(centers, axes_left, axes_right, axes_y))
+    ][::-1]
+    return lambda: create_irregular_radial_gradient(width, height, ellipse_params)
+
+
+def ring_case(width, height, count):
+    radius = 0.4 * min(width, height)
+    return lambda: create_ring_gradient(
+        (height, width), (width / 2, height / 2), 0.8 * radius, radius, 0.3
+    )
+
+
+def eccentric_case(width, height, count):
+    radius = 0.4 * min(width, height)
+    return lambda: create_eccentric_ring_gradient(
+        (height, width),
+        (width / 2, height / 2), radius,
+        (width / 2 + 0.1 * radius, height / 2 + 0.1 * radius), 0.6 * radius,
+        0.9, 0.1
+    )
+
+
+def triple_case(width, height, count):
+    radius = 0.4 * min(width, height)
+    return lambda: create_triple_eccentric_ring_gradient(
+        (height, width),
+        (width / 2, height / 2), radius,
+        (width / 2 + 0.1 * radius, height / 2 + 0.1 * radius), 0.7 * radius,
+        (width / 2 + 0.15 * radius, height / 2 + 0.15 * radius), 0.4 * radius,
+        0.9, 0.7, 0.1
+    )
+
+
+def quintuple_eccentric_case(width, height, count):
+    centers, axes_left, _, axes_y, brightnesses = ring_layout(width, height, count)
+    axes = list(zip(axes_left, axes_y))
+    return lambda: create_quintuple_eccentric_ellipse_gradient(
+        (height, width), centers, axes, brightnesses
+    )
+
+
+def quintuple_asymmetric_case(width, height, count):
+    centers, axes_left, axes_right, axes_y, brightnesses = ring_layout(width, height, count)
+    axes = list(zip(axes_left, axes_right, axes_y))
+    return lambda: create_asymmetric_ellipse_gradient(
+        (height, width), centers, axes, brightnesses
+    )
+
+
+# 渲染函数名 -> (用例构造函数, 固定环数；None表示环数可变)
+KERNELS = {
+    'create_irregular_radial_gradient': (irregular_case, None),
+    'create_ring_gradient': (ring_case, 2),
+    'create_eccentric_ring_gradient': (eccentric_case, 2),
+    'create_triple_eccentric_ring_gradient': (triple_case, 3),
+    'create_quintuple_eccentric_ellipse_gradient': (quintuple_eccentric_case, None),
+    'create_asymmetric_ellipse_gradient': (quintuple_asymmetric_case, None),
+}
+
+
+def time_call(func):
+    """重复调用func，返回每次调用的耗时列表(秒)"""
+    func()  # 预热
+    times = []
+    total = 0.0
+    while len(times) < MIN_REPEATS or (total < MIN_TIME and len(times) < MAX_REPEATS):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    return times
+
+
+def measure_memory(func):
+    """用tracemalloc测量一次调用的峰值内存，以及调用结束后仍存活的新内存块数
+
+    NumPy的数据缓冲区也会报告给tracemalloc，因此峰值包含所有中间数组。
+    tracemalloc只记录存活的内存块，不记录调用过程中分配又释放的次数，
+    每次调用的分配量以峰值（peak_canvases）反映。
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    alive = sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0)
+    del result
+    return peak - base, alive
+
+
+def relative_spread(times):
+    """耗时的相对波动：中位数比最短耗时多出的比例"""
+    best = min(times)
+    return (statistics.median(times) - best) / best if best > 0 else 0.0
+
+
+def run_case(kernel, width, height, count):
+    make_case, _ = KERNELS[kernel]
+    func = make_case(width, height, count)
+    times = time_call(func)
+    peak_bytes, blocks_alive_after_call = measure_memory(func)
+    canvas_bytes = width * height * 4
+    return {
+        'kernel': kernel,
+        'width': width,
+        'height': height,
+        'rings': count,
+        'repeats': len(times),
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'spread': relative_spread(times),
+        'peak_bytes': peak_bytes,
+        # 峰值时同时存在的float32整幅画布数，反映每次调用的中间数组分配量
+        'peak_canvases': peak_bytes / canvas_bytes,
+        'blocks_alive_after_call': blocks_alive_after_call,
+    }
+
+
+def case_key(result):
+    return (result['kernel'], result['width'], result['height'], result['rings'])
+
+
+def run_suite(kernels, sizes, ring_counts, verbose=True):
+    results = []
+    for kernel in kernels:
+        fixed_count = KERNELS[kernel][1]
+        counts = [fixed_count] if fixed_count is not None else ring_counts
+        for width, height in sizes:
+            for count in counts:
+                result = run_case(kernel, width, height, count)
+                results.append(result)
+                if verbose:
+                    print(f"{kernel:<45} {width:>5}x{height:<5} rings={count:<3} "
+                          f"{result['median_s'] * 1e3:9.2f} ms (spread {result['spread']:4.0%})  "
+                          f"peak {result['peak_bytes'] / 2**20:8.1f} MiB "
+                          f"({result['peak_canvases']:.1f} canvases)")
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """与基线比较，返回退化的用例列表 [(结果, 基线结果, 比值)]
+
+    比值为最短耗时之比；只有超过 1 + max(threshold, 本次波动, 基线波动) 时才算退化，
+    波动大的用例需要变慢得更明显才会被报告。没有spread字段的旧基线按0处理。
+    """
+    baseline_by_key = {case_key(entry): entry for entry in baseline['results']}
+    regressions = []
+    for result in results:
+        reference = baseline_by_key.get(case_key(result))
+        if reference is None:
+            continue
+        ratio = result['min_s'] / reference['min_s']
+        allowed = max(threshold, result.get('spread', 0.0), reference.get('spread', 0.0))
+        if ratio > 1 + allowed:
+            regressions.append((result, reference, ratio))
+    return regressions
+
+
+def environment():
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the gradient kernels.')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file for the results')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown of the fastest run relative to the baseline; '
+                             'a larger measured spread raises it (default: 0.10)')
+    parser.add_argument('--kernels', nargs='+', choices=sorted(KERNELS), default=list(KERNELS))
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=None, help='canvas sizes such as 1000x800')
+    parser.add_argument('--rings', nargs='+', type=int, default=None, help='ring counts for variable-count kernels')
+    parser.add_argument('--quick', action='store_true', help='run a reduced set of sizes and ring counts')
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    ring_counts = args.rings or (QUICK_RING_COUNTS if args.quick else RING_COUNTS)
+
+    results = run_suite(args.kernels, sizes, ring_counts)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for result, reference, ratio in regressions:
+            print(f"REGRESSION {result['kernel']} {result['width']}x{result['height']} rings={result['rings']}: "
+                  f"min {reference['min_s'] * 1e3:.2f} ms -> {result['min_s'] * 1e3:.2f} ms ({ratio:.2f}x, "
+                  f"spread {reference.get('spread', 0.0):.0%} -> {result['spread']:.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,8 @@
 import cv2
 import numpy as np
+from gradient_engine import create_boundary_blend_gradient
+from profiling import maybe_profile
+from render_loop import run_event_loop
 
 def create_eccentric_ring_gradient(size, outer_center, outer_radius, inner_center, inner_radius, outer_brightness, inner_brightness):
     """创建偏心圆环渐变
@@ -13,39 +16,14 @@ def create_eccentric_ring_gradient(size, outer_center, outer_radius, inner_cente
         outer_brightness: 外圆亮度值 (0-1)
         inner_brightness: 内圆亮度值 (0-1)
     """
-    canvas = np.zeros(size, dtype=np.float32)
-    y, x = np.ogrid[:size[0], :size[1]]
-    
-    # 计算到外圆圆心的距离
-    dist_from_outer = np.sqrt((x - outer_center[0])**2 + (y - outer_center[1])**2)
-    
-    # 计算到内圆圆心的距离
-    dist_from_inner = np.sqrt((x - inner_center[0])**2 + (y - inner_center[1])**2)
-    
-    # 找出在外圆内但不在内圆内的区域
-    ring_mask = (dist_from_outer <= outer_radius) & (dist_from_inner >= inner_radius)
-    
-    if ring_mask.any():
-        gradient = np.zeros_like(dist_from_outer)
-        valid_points = ring_mask
-        
-        # 对于每个点，计算它到内圆边界的最短距离
-        dist_to_inner = dist_from_inner - inner_radius
-        # 对于每个点，计算它到外圆边界的最短距离
-        dist_to_outer = outer_radius - dist_from_outer
-        
-        # 计算总距离（用于归一化）
-        total_dist = dist_to_inner + dist_to_outer
-        
-        # 在有效区域计算渐变
-        ratio = dist_to_inner[valid_points] / total_dist[valid_points]
-        
-        # 在外圆和内圆之间进行亮度渐变
-        gradient[valid_points] = outer_brightness + (inner_brightness - outer_brightness) * ratio
-        
-        canvas[valid_points] = gradient[valid_points]
-    
-    return canvas
+    # 按到内、外圆边界的像素距离混合两个亮度
+    return create_boundary_blend_gradient(
+        size,
+        centers=[outer_center, inner_center],
+        axes=[outer_radius, inner_radius],
+        brightnesses=[outer_brightness, inner_brightness],
+        scales=[outer_radius, inner_radius]
+    )
 
 def draw_frame():
     # 创建黑色画布 (480, 640)
@@ -74,20 +52,13 @@ def draw_frame():
     return ring
 
 def main():
+    if maybe_profile('eccentric_ring', lambda index: draw_frame()):
+        return
+    
     window_name = 'Eccentric Ring'
     cv2.namedWindow(window_name)
     
-    while True:
-        # 绘制帧
-        frame = draw_frame()
-        
-        # 显示帧
-        cv2.imshow(window_name, frame)
-        
-        # 检查退出
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+    run_event_loop(window_name, draw_frame)
     
     cv2.destroyAllWindows()
 
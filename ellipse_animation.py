@@ -1,7 +1,18 @@
+import argparse
 import cv2
 import numpy as np
 import time
-from ellipse_data import EllipseSet, ellipse_sets
+from ellipse_data import EllipseSet, ellipse_sets, ellipse_set_at
+from frame_bundle import FrameBundle, params_hash, write_bundle
+from frame_cache import FrameCache
+from hud_overlay import HudOverlay
+from instrumentation import Instrumentation
+from prefetch import FramePrefetcher
+from profiling import maybe_profile
+from radial_gradient import (SpriteCache, box_is_empty, create_irregular_radial_gradient,
+                             ellipse_bounding_box, intersect_boxes)
+from radial_profiles import GaussianProfile, profile_table
+from render_loop import IDLE_WAIT_MS, run_event_loop
 
 # 设置画布大小
 canvas_width = 1000
@@ -25,213 +36,578 @@ auto_move = False
 last_move_time = 0
 MOVE_INTERVAL = 50  # 移动间隔(ms)
 move_direction = -1  # -1表示向左移动，1表示向右移动
+move_position = 0.0  # 自动移动时的连续位置
 
-def create_irregular_radial_gradient(width, height, ellipse_params):
-    """
-    创建不规则椭圆形径向渐变图像
+# 自动移动按时间连续推进，每MOVE_INTERVAL毫秒移动一个位置；
+# 显示的位置量化到1/AUTO_MOVE_SUBSTEPS，一次往返只有有限个不同的位置
+AUTO_MOVE_SUBSTEPS = 8
+
+# 各椭圆的亮度值（从内到外）
+ELLIPSE_VALUES = (200, 180, 130, 10, 3)
+
+# 以下三项渲染设置只影响非整数中心的帧（自动移动的小数位置）；整数中心的帧
+# （包括所有ellipse_sets的帧和启动时预先渲染的帧）总是由sprite_cache的图块拼成
+
+# 渐变的计算精度，设为np.float32启用单精度、复用缓冲区的渲染模式
+RENDER_DTYPE = np.float64
+
+# 设为True时按可分离方式（一维高斯的外积）渲染
+RENDER_SEPARABLE = False
+
+# 高斯剖面查找表的误差上限（相对于椭圆亮度值）；设为None时精确计算exp
+RENDER_LUT_ERROR = None
+
+# 单个椭圆贡献图块的缓存，整数中心的帧由图块平移拼成
+SPRITE_CACHE_SIZE = 64
+sprite_cache = SpriteCache(maxsize=SPRITE_CACHE_SIZE)
+
+# HUD覆盖层，首次绘制时创建
+hud_overlay = None
+
+# 自动移动时在后台沿移动方向预先渲染的帧数；预取器在main中创建
+PREFETCH_DEPTH = 8
+prefetcher = None
+last_display_position = None
+
+# 渐进式渲染：画面参数变化时按PROGRESSIVE_LEVELS[0]的缩小倍数渲染后放大显示，
+# 静止每满PROGRESSIVE_IDLE_MS毫秒提高一级，最后一级应为1（全分辨率）；设为(1,)关闭。
+# 缩小倍数须能整除画布尺寸
+PROGRESSIVE_LEVELS = (2, 1)
+PROGRESSIVE_IDLE_MS = 150
+
+# 帧缓存：容量上限以及启动时是否预先渲染全部帧。容量按窗口实际缓存的帧计算：
+# 所有组索引的全分辨率帧，自动移动时每个量化位置一帧移动时分辨率（PROGRESSIVE_LEVELS[0]）
+# 的帧，以及FRAME_CACHE_IDLE_FRAMES帧静止后补全的全分辨率帧；往返播放时每帧都能命中缓存。
+# 总字节数限制在FRAME_CACHE_BYTES以内（1000x800时约86MB）
+AUTO_MOVE_POSITIONS = (MOVE_MAX - MOVE_MIN) * AUTO_MOVE_SUBSTEPS + 1
+FRAME_CACHE_IDLE_FRAMES = 16
+FRAME_CACHE_SIZE = AUTO_MOVE_POSITIONS + len(ellipse_sets) + FRAME_CACHE_IDLE_FRAMES
+FRAME_CACHE_BYTES = (
+    (len(ellipse_sets) + FRAME_CACHE_IDLE_FRAMES) * canvas_width * canvas_height
+    + AUTO_MOVE_POSITIONS * (canvas_width // PROGRESSIVE_LEVELS[0]) * (canvas_height // PROGRESSIVE_LEVELS[0])
+)
+WARM_UP_FRAMES = True
+frame_cache = FrameCache(maxsize=FRAME_CACHE_SIZE, maxbytes=FRAME_CACHE_BYTES)
+last_scene = None
+last_scene_change = 0
+
+# 增量更新：持久的BGR画面缓冲区，每帧只重绘渐变与HUD所在的区域；
+# 以及上一帧渐变可能非零的区域和HUD元素的区域
+frame_buffer = None
+last_gradient_box = None
+last_hud_rects = []
+
+# 各阶段耗时的统计：INSTRUMENTATION为True时从启动起记录，否则只在显示统计时记录。
+# 按STATS_KEY切换画面上的帧率/延迟显示（每STATS_REFRESH_MS毫秒刷新），
+# 退出时若有记录则写入STATS_PATH
+INSTRUMENTATION = False
+STATS_KEY = 'f'
+STATS_REFRESH_MS = 500
+STATS_PATH = 'ellipse_animation_stats.json'
+instrumentation = Instrumentation(enabled=INSTRUMENTATION)
+show_stats = False
+
+# 播放模式：设置为帧包路径（或使用命令行参数--bundle）时，帧包中已有的画面直接从
+# 映射的文件中取出，不做渐变计算；帧包由frame_bundle.py生成，参数变化后视为过期而不使用
+PLAYBACK_BUNDLE = None
+playback_bundle = None
+
+def build_ellipse_params(current_set, values=None):
+    """根据EllipseSet构建create_irregular_radial_gradient所需的椭圆参数列表
+    
+    Args:
+        current_set: 当前的EllipseSet
+        values: 各椭圆的亮度值，默认为ELLIPSE_VALUES
     """
-    # 创建坐标网格
-    y, x = np.ogrid[:height, :width]
-    
-    # 创建输出图像
-    height_field = np.zeros((height, width), dtype=float)
-    
-    # 创建最外层椭圆的mask
-    outer_mask = np.zeros((height, width), dtype=np.uint8)
-    
-    # 从内到外处理每个椭圆
-    for params in ellipse_params:
-        center_x = params['center'][0]
-        center_y = params['center'][1]
-        
-        # 分别计算左右两边到中心的距离
-        x_dist = x - center_x
-        y_dist = y - center_y
-        
-        # 根据点在椭圆左右两侧选择不同的x轴半径
-        x_radius = np.where(x_dist < 0, 
-                           params['axes_left'], 
-                           params['axes_right'])
-        
-        # 计算归一化距离
-        x_norm = x_dist / x_radius
-        y_norm = y_dist / params['axes_y']
-        
-        # 计算到中心的归一化距离
-        dist = np.sqrt(x_norm * x_norm + y_norm * y_norm)
-        
-        # 创建高斯形状的贡献
-        contribution = np.exp(-dist * dist * 2)
-        contribution = contribution * params['value']
-        
-        # 更新高度场
-        height_field = np.maximum(height_field, contribution)
-        
-        # 如果是最外层椭圆，创建mask
-        if params == ellipse_params[-1]:
-            mask = (dist <= 1).astype(np.uint8)
-            outer_mask = mask
-    
-    # 应用外层椭圆mask
-    height_field = height_field * outer_mask
-    
-    return height_field.astype(np.uint8)
-
-def draw_frame(move_count):
-    # 创建黑色画布
-    frame = np.zeros((canvas_height, canvas_width, 3), dtype=np.uint8)
+    if values is None:
+        values = ELLIPSE_VALUES
     
-    # 根据move_count选择对应的椭圆组
-    current_set_index = move_count + 15
-    current_set = ellipse_sets[current_set_index]
-    
-    # 构建椭圆参数列表
-    ellipse_params = [
-        {
-            'center': (BASE_CENTER_X + current_set.center1[0], 
-                      BASE_CENTER_Y + current_set.center1[1]),
-            'axes_left': current_set.axes1[0],
-            'axes_right': current_set.axes1[0],
-            'axes_y': current_set.axes1[1],
-            'value': 200
-        },
-        {
-            'center': (BASE_CENTER_X + current_set.center2[0], 
-                      BASE_CENTER_Y + current_set.center2[1]),
-            'axes_left': current_set.axes2[0],
-            'axes_right': current_set.axes2[0],
-            'axes_y': current_set.axes2[1],
-            'value': 180
-        },
-        {
-            'center': (BASE_CENTER_X + current_set.center3[0], 
-                      BASE_CENTER_Y + current_set.center3[1]),
-            'axes_left': current_set.axes3[0],
-            'axes_right': current_set.axes3[0],
-            'axes_y': current_set.axes3[1],
-            'value': 130
-        },
-        {
-            'center': (BASE_CENTER_X + current_set.center4[0], 
-                      BASE_CENTER_Y + current_set.center4[1]),
-            'axes_left': current_set.axes4[0],
-            'axes_right': current_set.axes4[0],
-            'axes_y': current_set.axes4[1],
-            'value': 10
-        },
-        {
-            'center': (BASE_CENTER_X + current_set.center5[0], 
-                      BASE_CENTER_Y + current_set.center5[1]),
-            'axes_left': current_set.axes5[0],
-            'axes_right': current_set.axes5[0],
-            'axes_y': current_set.axes5[1],
-            'value': 3
-        }
+    ellipse_params = []
+    for center, axes, value in zip(current_set.centers.tolist(), current_set.axes.tolist(), values):
+        ellipse_params.append({
+            'center': (BASE_CENTER_X + center[0], 
+                      BASE_CENTER_Y + center[1]),
+            'axes_left': axes[0],
+            'axes_right': axes[0],
+            'axes_y': axes[1],
+            'value': value
+        })
+    
+    return ellipse_params
+
+def scale_ellipse_params(ellipse_params, scale):
+    """把椭圆参数换算到缩小scale倍的画布上
+    
+    低分辨率像素i的中心对应全分辨率坐标 (i + 0.5) * scale - 0.5，
+    与cv2.resize放大时的像素对齐方式一致。
+    """
+    return [
+        dict(params,
+             center=((params['center'][0] + 0.5) / scale - 0.5,
+                     (params['center'][1] + 0.5) / scale - 0.5),
+             axes_left=params['axes_left'] / scale,
+             axes_right=params['axes_right'] / scale,
+             axes_y=params['axes_y'] / scale)
+        for params in ellipse_params
     ]
+
+def render_ellipse_params(ellipse_params, scale=1):
+    """按当前画布尺寸（缩小scale倍）和渲染精度渲染灰度渐变图像（不经过帧缓存）"""
+    return create_irregular_radial_gradient(
+        canvas_width // scale, 
+        canvas_height // scale, 
+        ellipse_params,
+        sprites=sprite_cache,
+        dtype=RENDER_DTYPE,
+        lut=render_lut(),
+        separable=RENDER_SEPARABLE
+    )
+
+def render_lut():
+    """按RENDER_LUT_ERROR返回高斯剖面的查找表，未启用时返回None"""
+    if RENDER_LUT_ERROR is None:
+        return None
+    return profile_table(GaussianProfile(), max_error=RENDER_LUT_ERROR)
+
+def frame_key(set_index, ellipse_params):
+    """由组索引、画布尺寸和椭圆参数构成帧缓存的键
     
-    # 创建灰度渐变图像
-    gray_layer = create_irregular_radial_gradient(
-        canvas_width, 
-        canvas_height, 
-        ellipse_params
+    椭圆参数在每次查找时都从ellipse_sets、ELLIPSE_VALUES重新构建，
+    因此这些数据、画布尺寸或渲染精度发生变化时会自然地得到新的键。
+    """
+    return (
+        set_index,
+        canvas_width,
+        canvas_height,
+        np.dtype(RENDER_DTYPE).str,
+        RENDER_LUT_ERROR,
+        RENDER_SEPARABLE,
+        tuple(
+            (tuple(p['center']), p['axes_left'], p['axes_right'], p['axes_y'], p['value'])
+            for p in ellipse_params
+        )
     )
+
+def render_cached(key_base, ellipse_params, scale=1):
+    """按帧缓存渲染；scale大于1且全分辨率帧不在缓存中时渲染缩小的帧
+    
+    播放模式下帧包中已有的画面直接返回全分辨率的帧。
+    """
+    if playback_bundle is not None:
+        frame = playback_bundle.get(key_base)
+        if frame is not None:
+            return frame
+    full_key = frame_key(key_base, ellipse_params)
+    if scale > 1 and full_key not in frame_cache:
+        ellipse_params = scale_ellipse_params(ellipse_params, scale)
+        return frame_cache.get_or_render(
+            frame_key((key_base, scale), ellipse_params),
+            lambda: render_ellipse_params(ellipse_params, scale)
+        )
+    return frame_cache.get_or_render(
+        full_key,
+        lambda: render_ellipse_params(ellipse_params)
+    )
+
+def render_gradient(set_index, scale=1):
+    """渲染指定组索引的灰度渐变图像，优先从帧缓存中读取
+    
+    返回的数组是只读的缓存帧；scale大于1时可能是缩小scale倍的帧。
+    """
+    return render_cached(set_index, build_ellipse_params(ellipse_sets[set_index]), scale)
+
+def render_gradient_at(position, scale=1):
+    """渲染任意（可为小数）位置的灰度渐变图像
+    
+    椭圆参数由ellipse_set_at按需插值，渲染结果同样经过帧缓存。
+    """
+    return render_cached(('position', position), build_ellipse_params(ellipse_set_at(position)), scale)
+
+def prefetch_gradient(position):
+    """预取器使用的渲染函数，按移动时的渲染等级渲染"""
+    return render_gradient_at(position, PROGRESSIVE_LEVELS[0])
+
+def warm_up_frame_cache():
+    """预先渲染所有组索引的渐变图像"""
+    for set_index in range(len(ellipse_sets)):
+        render_gradient(set_index)
+
+def bundle_keys(substeps=AUTO_MOVE_SUBSTEPS):
+    """帧包中的键：所有组索引，以及MOVE_MIN到MOVE_MAX之间每1/substeps一个的连续位置"""
+    keys = list(range(len(ellipse_sets)))
+    if substeps > 0:
+        keys += [('position', k / substeps) 
+                 for k in range(MOVE_MIN * substeps, MOVE_MAX * substeps + 1)]
+    return keys
+
+def bundle_params(key):
+    """帧包中的键对应的椭圆参数"""
+    if isinstance(key, tuple):
+        return build_ellipse_params(ellipse_set_at(key[1]))
+    return build_ellipse_params(ellipse_sets[key])
+
+def bundle_hash(keys):
+    """帧包的参数哈希：画布尺寸、渲染设置以及每个键对应的椭圆参数"""
+    parts = [canvas_width, canvas_height, np.dtype(RENDER_DTYPE).str, RENDER_LUT_ERROR, RENDER_SEPARABLE]
+    for key in keys:
+        parts.append(key)
+        parts.append(np.array([
+            (*p['center'], p['axes_left'], p['axes_right'], p['axes_y'], p['value'])
+            for p in bundle_params(key)
+        ], dtype=np.float64))
+    return params_hash(*parts)
+
+def build_frame_bundle(path, substeps=AUTO_MOVE_SUBSTEPS):
+    """把所有组索引和连续位置的渐变图像渲染到帧包中，返回帧数
+    
+    逐帧渲染并写入，不经过帧缓存，内存占用与帧数无关。
+    """
+    keys = bundle_keys(substeps)
+    frames = (render_ellipse_params(bundle_params(key)) for key in keys)
+    write_bundle(path, frames, keys, (canvas_height, canvas_width), bundle_hash(keys),
+                 metadata={'substeps': substeps})
+    return len(keys)
+
+def load_frame_bundle(path):
+    """打开帧包用于播放；帧包无法读取或与当前参数不一致时打印原因并返回None"""
+    try:
+        bundle = FrameBundle(path)
+    except (OSError, ValueError) as error:
+        print(f"cannot use frame bundle {path} ({error}), rendering frames instead")
+        return None
+    if bundle.frame_shape != (canvas_height, canvas_width) or bundle.is_stale(bundle_hash(bundle.keys)):
+        substeps = bundle.metadata.get('substeps')
+        option = '' if substeps is None else f" --substeps {substeps}"
+        print(f"{path} is stale, rendering frames instead; "
+              f"rebuild it with: python frame_bundle.py {path}{option}")
+        return None
+    return bundle
+
+def build_hud():
+    """创建HUD覆盖层：绘图区域边框、状态信息和操作说明"""
+    hud = HudOverlay((canvas_height, canvas_width, 3))
     
-    # 将灰度图转换为BGR格式
-    frame = cv2.cvtColor(gray_layer, cv2.COLOR_GRAY2BGR)
-    
-    # 绘制绘图区域边框
-    cv2.rectangle(frame, 
-                 (drawing_area_x, drawing_area_y), 
-                 (drawing_area_x + drawing_area_width, drawing_area_y + drawing_area_height), 
-                 (255, 255, 255),
-                 1)
-    
-    # 添加状态信息
-    cv2.putText(frame, 
-                f"Current Index: {move_count} (Array Index: {current_set_index})", 
-                (10, 30), 
-                cv2.FONT_HERSHEY_SIMPLEX, 
-                0.7, 
-                (255, 255, 255), 
-                1)
-    
-    # 添加自动移动状态
-    mode_text = "Auto Move: ON" if auto_move else "Auto Move: OFF"
-    cv2.putText(frame, 
-                mode_text, 
-                (10, 60), 
-                cv2.FONT_HERSHEY_SIMPLEX, 
-                0.7, 
-                (255, 255, 255), 
-                1)
-    
-    # 添加操作说明
+    # 绘图区域边框
+    hud.add_rectangle('drawing_area',
+                      (drawing_area_x, drawing_area_y), 
+                      (drawing_area_x + drawing_area_width, drawing_area_y + drawing_area_height), 
+                      (255, 255, 255),
+                      1)
+    
+    # 状态信息和自动移动状态，每帧按需更新
+    hud.add_text('index', (10, 30), 0.7, (255, 255, 255))
+    hud.add_text('mode', (10, 60), 0.7, (255, 255, 255))
+    hud.add_text('stats', (10, 90), 0.6, (0, 255, 255))
+    
+    # 操作说明
     instructions = [
         "Controls:",
         "A/Left Arrow : Move Left",
         "D/Right Arrow: Move Right",
         "N           : Start Auto Move",
         "M           : Stop Auto Move",
+        f"{STATS_KEY.upper()}           : Toggle FPS/Latency Stats",
         "Q           : Quit"
     ]
     
-    y_pos = 700
-    for instruction in instructions:
-        cv2.putText(frame, 
-                    instruction, 
-                    (10, y_pos), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 
-                    0.6, 
-                    (200, 200, 200), 
-                    1)
+    # 从画布底部向上排列，使最后一行也在画布内
+    y_pos = canvas_height - 15 - 25 * (len(instructions) - 1)
+    for i, instruction in enumerate(instructions):
+        hud.add_text(f'instruction{i}', (10, y_pos), 0.6, (200, 200, 200), instruction)
         y_pos += 25
     
-    return frame
+    return hud
 
-def handle_auto_move():
-    global move_count, move_direction, last_move_time
-    
-    current_time = int(time.time() * 1000)
-    if current_time - last_move_time >= MOVE_INTERVAL:
-        if move_direction == -1:
-            if move_count > MOVE_MIN:
-                move_count -= 1
-            else:
-                move_direction = 1
+def get_hud():
+    """返回与当前画布尺寸一致的HUD覆盖层，尺寸变化时重新创建"""
+    global hud_overlay
+    if hud_overlay is None or hud_overlay.shape[:2] != (canvas_height, canvas_width):
+        hud_overlay = build_hud()
+    return hud_overlay
+
+def gradient_region(ellipse_params, gray_layer, scale):
+    """
+    返回 (box, region)：画面中渐变可能非零的区域，以及该区域内全分辨率的灰度内容
+    
+    gray_layer为缩小的帧时只放大区域内的部分；区域向外多取一个低分辨率像素，
+    使裁剪边缘的插值与整幅放大的结果相同。
+    """
+    if gray_layer.shape == (canvas_height, canvas_width):
+        box = ellipse_bounding_box(ellipse_params[-1], canvas_width, canvas_height)
+        x0, y0, x1, y1 = box
+        return box, gray_layer[y0:y1, x0:x1]
+    
+    small_height, small_width = gray_layer.shape
+    x0, y0, x1, y1 = ellipse_bounding_box(
+        scale_ellipse_params(ellipse_params, scale)[-1], small_width, small_height
+    )
+    x0, y0 = max(x0 - 1, 0), max(y0 - 1, 0)
+    x1, y1 = min(x1 + 1, small_width), min(y1 + 1, small_height)
+    box = (x0 * scale, y0 * scale, x1 * scale, y1 * scale)
+    if box_is_empty(box):
+        return box, None
+    region = cv2.resize(gray_layer[y0:y1, x0:x1], 
+                        ((x1 - x0) * scale, (y1 - y0) * scale), 
+                        interpolation=cv2.INTER_LINEAR)
+    return box, region
+
+def repaint(frame, rect, box, region):
+    """把rect内的画面恢复为不含HUD的渐变（box之外为黑色）"""
+    x0, y0, x1, y1 = rect
+    frame[y0:y1, x0:x1] = 0
+    ix0, iy0, ix1, iy1 = intersect_boxes(rect, box)
+    if region is None or box_is_empty((ix0, iy0, ix1, iy1)):
+        return
+    target = frame[iy0:iy1, ix0:ix1]
+    source = region[iy0 - box[1]:iy1 - box[1], ix0 - box[0]:ix1 - box[0]]
+    # cvtColor直接写入画面缓冲区的视图；若OpenCV另行分配了结果则复制回去
+    converted = cv2.cvtColor(source, cv2.COLOR_GRAY2BGR, dst=target)
+    if not np.shares_memory(converted, target):
+        target[...] = converted
+
+def union_box(a, b):
+    """两个包围盒的并集的包围盒，空盒不计入"""
+    if box_is_empty(a):
+        return b
+    if box_is_empty(b):
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+def contains_box(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] 
+            and inner[2] <= outer[2] and inner[3] <= outer[3])
+
+def update_frame_buffer(box, region, hud):
+    """
+    增量更新持久的画面缓冲区并合成HUD
+    
+    只重绘上一帧与这一帧渐变区域的并集，以及上一帧与这一帧HUD元素覆盖的区域，
+    每帧的开销与椭圆和HUD的大小有关，而与画布大小无关。
+    """
+    global frame_buffer, last_gradient_box, last_hud_rects
+    
+    shape = (canvas_height, canvas_width, 3)
+    hud_rects = hud.rects()
+    if frame_buffer is None or frame_buffer.shape != shape:
+        frame_buffer = np.zeros(shape, dtype=np.uint8)
+        dirty = [(0, 0, canvas_width, canvas_height)]
+    else:
+        # 相邻两帧的渐变区域大部分重叠，合并为一个区域重绘；已被其包含的HUD区域不再重绘
+        gradient_dirty = union_box(last_gradient_box, box)
+        dirty = [gradient_dirty] + [
+            rect for rect in set(last_hud_rects + hud_rects) 
+            if not contains_box(gradient_dirty, rect)
+        ]
+    
+    with instrumentation.stage('convert'):
+        for rect in dirty:
+            if not box_is_empty(rect):
+                repaint(frame_buffer, rect, box, region)
+    with instrumentation.stage('hud'):
+        hud.composite(frame_buffer)
+    
+    last_gradient_box = box
+    last_hud_rects = hud_rects
+    return frame_buffer
+
+def draw_frame(move_count, position=None, scale=1):
+    """
+    绘制一帧：灰度渐变加HUD
+    
+    返回的是持久的画面缓冲区，下次调用时会被原地更新，需要保留时应先复制。
+    """
+    # 根据move_count选择对应的椭圆组
+    current_set_index = move_count + 15
+    
+    # 创建灰度渐变图像，给定连续位置时按该位置渲染；scale大于1时按低分辨率渲染后放大
+    with instrumentation.stage('render'):
+        if position is None:
+            ellipse_params = build_ellipse_params(ellipse_sets[current_set_index])
+            gray_layer = render_cached(current_set_index, ellipse_params, scale)
+            index_text = f"Current Index: {move_count} (Array Index: {current_set_index})"
         else:
-            if move_count < MOVE_MAX:
-                move_count += 1
-            else:
-                move_direction = -1
-        
-        last_move_time = current_time
+            ellipse_params = build_ellipse_params(ellipse_set_at(position))
+            gray_layer = render_cached(('position', position), ellipse_params, scale)
+            index_text = f"Current Index: {move_count} (Position: {position:.3f})"
+    with instrumentation.stage('upscale'):
+        box, region = gradient_region(ellipse_params, gray_layer, scale)
+    
+    # 更新状态信息、自动移动状态和统计信息，只重绘变化的区域后合成HUD
+    with instrumentation.stage('hud_text'):
+        hud = get_hud()
+        hud.set_text('index', index_text)
+        hud.set_text('mode', "Auto Move: ON" if auto_move else "Auto Move: OFF")
+        hud.set_text('stats', instrumentation.summary('frame') if show_stats else '')
+    return update_frame_buffer(box, region, hud)
+
+def reflect(position, direction):
+    """越过MOVE_MIN或MOVE_MAX的部分反射回来并改变方向，返回 (position, direction)"""
+    if position < MOVE_MIN:
+        return 2 * MOVE_MIN - position, 1
+    if position > MOVE_MAX:
+        return 2 * MOVE_MAX - position, -1
+    return position, direction
+
+def handle_auto_move():
+    """按经过的时间连续推进位置，在MOVE_MIN和MOVE_MAX之间往返"""
+    global move_count, move_direction, move_position, last_move_time
+    
+    current_time = time.time() * 1000
+    elapsed = current_time - last_move_time
+    last_move_time = current_time
+    
+    position, move_direction = reflect(move_position + move_direction * elapsed / MOVE_INTERVAL,
+                                       move_direction)
+    move_position = min(max(position, MOVE_MIN), MOVE_MAX)
+    move_count = int(round(move_position))
+
+def display_position():
+    """当前自动移动位置量化后的显示位置"""
+    return round(move_position * AUTO_MOVE_SUBSTEPS) / AUTO_MOVE_SUBSTEPS
+
+def predict_positions(position, direction, stride, count):
+    """沿当前方向预测接下来count个显示位置，到达边界后反向"""
+    positions = []
+    for _ in range(count):
+        position, direction = reflect(position + direction * stride, direction)
+        positions.append(round(position * AUTO_MOVE_SUBSTEPS) / AUTO_MOVE_SUBSTEPS)
+    return positions
+
+def current_scene():
+    """决定画面内容的参数"""
+    if auto_move:
+        return (move_count, auto_move, display_position())
+    return (move_count, auto_move)
+
+def progressive_scale():
+    """按画面静止的时长选择当前的缩小倍数"""
+    global last_scene, last_scene_change
+    
+    scene = current_scene()
+    now = time.time() * 1000
+    if scene != last_scene:
+        last_scene = scene
+        last_scene_change = now
+    level = int((now - last_scene_change) // PROGRESSIVE_IDLE_MS)
+    return PROGRESSIVE_LEVELS[min(level, len(PROGRESSIVE_LEVELS) - 1)]
+
+def current_state():
+    """决定画面内容的状态（含渲染等级），变化时显示循环才重新渲染
+    
+    显示统计时每STATS_REFRESH_MS毫秒变化一次，使统计信息定期刷新。
+    """
+    state = current_scene() + (progressive_scale(),)
+    if show_stats:
+        state += (int(time.time() * 1000 // STATS_REFRESH_MS),)
+    return state
+
+def render_current_frame():
+    global last_display_position
+    
+    scale = progressive_scale()
+    if not auto_move:
+        return draw_frame(move_count, scale=scale)
+    
+    # 该位置若已在后台渲染，等待其完成后直接从帧缓存取得
+    position = display_position()
+    if prefetcher is not None:
+        prefetcher.wait(position)
+    frame = draw_frame(move_count, position, scale)
+    
+    # 按最近一帧的移动距离预测接下来的位置并在后台渲染
+    if prefetcher is not None:
+        stride = 1 / AUTO_MOVE_SUBSTEPS
+        if last_display_position is not None:
+            stride = min(max(abs(position - last_display_position), stride), 1)
+        prefetcher.schedule(predict_positions(move_position, move_direction, stride, PREFETCH_DEPTH))
+    last_display_position = position
+    
+    return frame
+
+def tick():
+    if auto_move:
+        handle_auto_move()
+
+def wait_time():
+    """自动移动时按显示速率刷新，否则空闲等待按键"""
+    return 1 if auto_move else IDLE_WAIT_MS
+
+def handle_key(key):
+    global move_count, auto_move, move_direction, move_position, last_move_time
+    global last_display_position, show_stats
+    
+    # 键盘操作会使预测失效，取消尚未开始的预取
+    if key != -1 and prefetcher is not None:
+        prefetcher.cancel()
+        last_display_position = None
+    
+    if key == ord('a') or key == 81:
+        if not auto_move and move_count > MOVE_MIN:
+            move_count -= 1
+    elif key == ord('d') or key == 83:
+        if not auto_move and move_count < MOVE_MAX:
+            move_count += 1
+    elif key == ord('n'):
+        auto_move = True
+        move_direction = -1
+        move_count = 0
+        move_position = 0.0
+        last_move_time = time.time() * 1000
+    elif key == ord('m'):
+        auto_move = False
+    elif key == ord(STATS_KEY):
+        show_stats = not show_stats
+        instrumentation.enabled = INSTRUMENTATION or show_stats
+
+def profile_frame(index):
+    """剖析时绘制的第index帧：以自动移动的步长在MOVE_MIN到MOVE_MAX之间连续移动"""
+    span = (MOVE_MAX - MOVE_MIN) * AUTO_MOVE_SUBSTEPS
+    position = MOVE_MIN + (index % (span + 1)) / AUTO_MOVE_SUBSTEPS
+    return draw_frame(int(round(position)), position)
+
+def reset_render_state():
+    """清空帧缓存、图块缓存以及画面缓冲区和HUD，使下一帧从头渲染"""
+    global frame_buffer, last_gradient_box, last_hud_rects, hud_overlay
+    
+    frame_cache.clear()
+    sprite_cache.clear()
+    frame_buffer = None
+    last_gradient_box = None
+    last_hud_rects = []
+    hud_overlay = None
 
 def main():
-    global move_count, auto_move, move_direction
-    
-    while True:
-        frame = draw_frame(move_count)
-        cv2.imshow('Ellipse Animation', frame)
-        
-        if auto_move:
-            handle_auto_move()
-        
-        key = cv2.waitKey(1)
-        
-        if key == ord('q'):
-            break
-        elif key == ord('a') or key == 81:
-            if not auto_move and move_count > MOVE_MIN:
-                move_count -= 1
-        elif key == ord('d') or key == 83:
-            if not auto_move and move_count < MOVE_MAX:
-                move_count += 1
-        elif key == ord('n'):
-            auto_move = True
-            move_direction = -1
-            move_count = 0
-        elif key == ord('m'):
-            auto_move = False
+    global prefetcher, playback_bundle
+    
+    if maybe_profile('ellipse_animation', profile_frame, reset=reset_render_state):
+        return
+    
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--bundle', default=PLAYBACK_BUNDLE)
+    bundle_path = parser.parse_known_args()[0].bundle
+    if bundle_path is not None:
+        playback_bundle = load_frame_bundle(bundle_path)
+    
+    if WARM_UP_FRAMES and playback_bundle is None:
+        warm_up_frame_cache()
+    
+    instrumentation.enabled = INSTRUMENTATION or show_stats
+    prefetcher = FramePrefetcher(prefetch_gradient)
+    try:
+        # 只有状态变化时才重新渲染，空闲时只处理窗口事件
+        run_event_loop('Ellipse Animation', 
+                       render_current_frame, 
+                       get_state=current_state, 
+                       handle_key=handle_key, 
+                       tick=tick, 
+                       wait_ms=wait_time,
+                       instrumentation=instrumentation)
+    finally:
+        prefetcher.shutdown()
+        prefetcher = None
+        if instrumentation.samples:
+            instrumentation.dump(STATS_PATH)
+            print(f"stage timings written to {STATS_PATH}")
     
     cv2.destroyAllWindows()
 
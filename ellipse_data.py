@@ -1,95 +1,324 @@
 import numpy as np
-from dataclasses import dataclass
-from typing import Tuple, List
+from functools import lru_cache
+from typing import List, Sequence
+
+# 每个椭圆的字段：中心x、中心y、长轴、短轴、自定义参数
+FIELDS = ('center_x', 'center_y', 'major', 'minor', 'param')
+CENTER_FIELDS = slice(0, 2)
+AXES_FIELDS = slice(2, 5)
+
 
-@dataclass
 class EllipseSet:
-    # 5个椭圆的中心坐标
-    center1: Tuple[int, int]
-    center2: Tuple[int, int]
-    center3: Tuple[int, int]
-    center4: Tuple[int, int]
-    center5: Tuple[int, int]
-    
-    # 5个椭圆的轴信息 (长轴,短轴,自定义参数)
-    axes1: Tuple[int, int, int]
-    axes2: Tuple[int, int, int]
-    axes3: Tuple[int, int, int]
-    axes4: Tuple[int, int, int]
-    axes5: Tuple[int, int, int]
-
-def init_ellipse_sets(left_set: EllipseSet, center_set: EllipseSet, right_set: EllipseSet) -> List[EllipseSet]:
-    """
-    根据-15,0,15三个位置的EllipseSet，插值生成所有31个EllipseSet
-    """
-    sets = []
-    
-    # 生成15个点的插值（左半部分）
-    for i in range(15):
-        # 为每个椭圆生成插值后的参数
-        axes_list = []
-        centers_list = []
-        for j in range(1, 6):  # 5个椭圆
-            left_axes = getattr(left_set, f'axes{j}')
-            center_axes = getattr(center_set, f'axes{j}')
-            left_center = getattr(left_set, f'center{j}')
-            center_center = getattr(center_set, f'center{j}')
-            
-            # 对长轴和短轴进行插值
-            major_axis = int(np.interp(i, [0, 14], [left_axes[0], center_axes[0]]))
-            minor_axis = int(np.interp(i, [0, 14], [left_axes[1], center_axes[1]]))
-            
-            # 对center坐标进行插值
-            center_x = int(np.interp(i, [0, 14], [left_center[0], center_center[0]]))
-            center_y = int(np.interp(i, [0, 14], [left_center[1], center_center[1]]))
-            
-            axes_list.append((major_axis, minor_axis, j))  # j作为自定义参数
-            centers_list.append((center_x, center_y))
-            
-        # 创建新的EllipseSet实例
-        new_set = EllipseSet(
-            center1=centers_list[0], center2=centers_list[1], 
-            center3=centers_list[2], center4=centers_list[3], 
-            center5=centers_list[4],
-            axes1=axes_list[0], axes2=axes_list[1], axes3=axes_list[2], 
-            axes4=axes_list[3], axes5=axes_list[4]
-        )
-        sets.append(new_set)
-    
-    # 添加中心点
-    sets.append(center_set)
-    
-    # 生成15个点的插值（右半部分）
-    for i in range(15):
-        axes_list = []
-        centers_list = []
-        for j in range(1, 6):
-            center_axes = getattr(center_set, f'axes{j}')
-            right_axes = getattr(right_set, f'axes{j}')
-            center_center = getattr(center_set, f'center{j}')
-            right_center = getattr(right_set, f'center{j}')
-            
-            # 对长轴和短轴进行插值
-            major_axis = int(np.interp(i, [0, 14], [center_axes[0], right_axes[0]]))
-            minor_axis = int(np.interp(i, [0, 14], [center_axes[1], right_axes[1]]))
-            
-            # 对center坐标进行插值
-            center_x = int(np.interp(i, [0, 14], [center_center[0], right_center[0]]))
-            center_y = int(np.interp(i, [0, 14], [center_center[1], right_center[1]]))
-            
-            axes_list.append((major_axis, minor_axis, j))
-            centers_list.append((center_x, center_y))
-            
-        new_set = EllipseSet(
-            center1=centers_list[0], center2=centers_list[1], 
-            center3=centers_list[2], center4=centers_list[3], 
-            center5=centers_list[4],
-            axes1=axes_list[0], axes2=axes_list[1], axes3=axes_list[2], 
-            axes4=axes_list[3], axes5=axes_list[4]
-        )
-        sets.append(new_set)
-    
-    return sets
+    """
+    一组椭圆的参数，底层为形状 (ellipses, fields) 的数组
+    
+    可以像原来的dataclass一样按字段构造（位置参数按 center1..centerN, axes1..axesN 的顺序）：
+        EllipseSet(center1=(x, y), ..., axes1=(major, minor, param), ...)
+    也可以直接传入数组。全部为整数时按int32存放，否则按float64存放，不做取整。
+    属性centerN、axesN返回第N个椭圆的中心坐标和轴信息元组。
+    """
+    __slots__ = ('data',)
+    
+    def __init__(self, *args, data=None, **fields):
+        if data is None and len(args) == 1 and not fields and np.ndim(args[0]) == 2:
+            data = args[0]
+        elif data is None:
+            count = (len(args) + len(fields)) // 2
+            names = [f'center{j}' for j in range(1, count + 1)] + [f'axes{j}' for j in range(1, count + 1)]
+            if len(args) > len(names):
+                raise TypeError("EllipseSet needs a center and an axes argument for each ellipse")
+            values = dict(zip(names, args))
+            for name, value in fields.items():
+                if name in values:
+                    raise TypeError(f"EllipseSet got multiple values for {name!r}")
+                values[name] = value
+            missing = [name for name in names if name not in values]
+            if missing or len(values) != len(names):
+                raise TypeError(f"EllipseSet needs center1..centerN and axes1..axesN, missing {missing}")
+            rows = [tuple(values[f'center{j}']) + tuple(values[f'axes{j}']) for j in range(1, count + 1)]
+            data = np.array(rows).reshape(count, len(FIELDS))
+            data = data.astype(np.int32 if data.dtype.kind in 'iub' else np.float64)
+        object.__setattr__(self, 'data', np.asarray(data))
+    
+    @property
+    def count(self) -> int:
+        """椭圆个数"""
+        return self.data.shape[0]
+    
+    @property
+    def centers(self) -> np.ndarray:
+        """所有椭圆的中心坐标，形状 (ellipses, 2)"""
+        return self.data[:, CENTER_FIELDS]
+    
+    @property
+    def axes(self) -> np.ndarray:
+        """所有椭圆的轴信息，形状 (ellipses, 3)"""
+        return self.data[:, AXES_FIELDS]
+    
+    def __getattr__(self, name):
+        # 兼容 center1..centerN / axes1..axesN 的访问方式
+        for prefix, fields in (('center', CENTER_FIELDS), ('axes', AXES_FIELDS)):
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                j = int(suffix)
+                if 1 <= j <= self.count:
+                    return tuple(self.data[j - 1, fields].tolist())
+        raise AttributeError(name)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("EllipseSet is read-only, build a new one from an array instead")
+    
+    def __reduce__(self):
+        # 只读的__setattr__会使默认的pickle/copy失败，改为由data重新构造
+        return EllipseSet, (self.data,)
+    
+    def __eq__(self, other):
+        if not isinstance(other, EllipseSet):
+            return NotImplemented
+        return np.array_equal(self.data, other.data)
+    
+    def __repr__(self):
+        centers = ', '.join(f"center{j}={getattr(self, f'center{j}')}" for j in range(1, self.count + 1))
+        axes = ', '.join(f"axes{j}={getattr(self, f'axes{j}')}" for j in range(1, self.count + 1))
+        return f"EllipseSet({centers}, {axes})"
+
+
+class EllipseTable:
+    """
+    按步排列的EllipseSet序列，底层为形状 (steps, ellipses, fields) 的数组
+    
+    table[i] 返回第i步的EllipseSet视图，不复制数据。
+    """
+    
+    def __init__(self, data):
+        self.data = np.asarray(data)
+    
+    def __len__(self):
+        return self.data.shape[0]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EllipseTable(self.data[index])
+        return EllipseSet(self.data[index])
+    
+    def __iter__(self):
+        for row in self.data:
+            yield EllipseSet(row)
+
+
+def _keyframe_arrays(keyframes, key_positions):
+    """把关键帧整理为形状 (K, ellipses, fields) 的float64数组，并检查关键帧位置"""
+    if isinstance(keyframes, np.ndarray):
+        frames = keyframes.astype(float)
+    else:
+        frames = np.stack([np.asarray(k.data, dtype=float) for k in keyframes])
+    xp = np.asarray(key_positions, dtype=float)
+    if len(xp) != len(frames) or len(xp) < 2:
+        raise ValueError("need at least two keyframes with one position each")
+    if np.any(np.diff(xp) <= 0):
+        raise ValueError("key_positions must be strictly increasing")
+    return frames, xp
+
+
+def _segments(xp, x):
+    """每个位置所在的关键帧区间，与np.interp的计算方式一致"""
+    return np.clip(np.searchsorted(xp, x, side='right') - 1, 0, len(xp) - 2)
+
+
+def interpolate_ellipse_table(keyframes: Sequence[EllipseSet], key_positions, positions) -> np.ndarray:
+    """
+    对关键帧做分段线性插值，一次向量化计算出所有位置的椭圆参数
+    
+    Args:
+        keyframes: K个EllipseSet（或形状为 (K, ellipses, fields) 的数组）
+        key_positions: K个严格递增的关键帧位置
+        positions: S个需要求值的位置，超出范围时取端点的值
+    
+    Returns:
+        形状为 (S, ellipses, fields) 的float64数组
+    """
+    frames, xp = _keyframe_arrays(keyframes, key_positions)
+    x = np.asarray(positions, dtype=float)
+    
+    j = _segments(xp, x)
+    slope = (frames[j + 1] - frames[j]) / (xp[j + 1] - xp[j])[:, None, None]
+    table = slope * (x - xp[j])[:, None, None] + frames[j]
+    table[x <= xp[0]] = frames[0]
+    table[x >= xp[-1]] = frames[-1]
+    return table
+
+
+def spline_moments(frames: np.ndarray, xp: np.ndarray) -> np.ndarray:
+    """
+    自然三次样条在各关键帧处的二阶导数（两端为0），与frames形状相同
+    
+    对所有椭圆的所有字段同时求解同一个三对角方程组。
+    """
+    moments = np.zeros_like(frames)
+    if len(xp) < 3:
+        return moments
+    h = np.diff(xp)
+    slopes = np.diff(frames, axis=0) / h[:, None, None]
+    n = len(xp) - 2
+    system = np.zeros((n, n))
+    system[np.arange(n), np.arange(n)] = 2 * (h[:-1] + h[1:])
+    system[np.arange(1, n), np.arange(n - 1)] = h[1:-1]
+    system[np.arange(n - 1), np.arange(1, n)] = h[1:-1]
+    rhs = 6 * (slopes[1:] - slopes[:-1])
+    moments[1:-1] = np.linalg.solve(system, rhs.reshape(n, -1)).reshape(rhs.shape)
+    return moments
+
+
+def spline_ellipse_table(keyframes: Sequence[EllipseSet], key_positions, positions, moments=None) -> np.ndarray:
+    """
+    对关键帧做自然三次样条插值，参数同interpolate_ellipse_table
+    
+    样条经过所有关键帧且一阶、二阶导数连续；关键帧之间可能略微越过关键帧的值。
+    
+    Args:
+        moments: 可选的spline_moments结果，多次求值时可以复用
+    """
+    frames, xp = _keyframe_arrays(keyframes, key_positions)
+    if moments is None:
+        moments = spline_moments(frames, xp)
+    x = np.asarray(positions, dtype=float)
+    
+    j = _segments(xp, x)
+    h = (xp[j + 1] - xp[j])[:, None, None]
+    t = (x - xp[j])[:, None, None]
+    u = h - t
+    table = ((moments[j] * u ** 3 + moments[j + 1] * t ** 3) / (6 * h)
+             + (frames[j] / h - moments[j] * h / 6) * u
+             + (frames[j + 1] / h - moments[j + 1] * h / 6) * t)
+    table[x <= xp[0]] = frames[0]
+    table[x >= xp[-1]] = frames[-1]
+    return table
+
+
+class Timeline:
+    """
+    任意个数、任意位置的关键帧组成的时间线，按需插值出EllipseSet
+    
+    timeline.at(p) 返回任意（可为小数）位置p的EllipseSet；timeline[i] 返回
+    start + i * step 处的EllipseSet（start为第一个关键帧的位置），与EllipseTable的
+    下标访问方式相同。结果只在访问时计算，最近使用的cache_size个位置被缓存，
+    不需要预先生成所有的EllipseSet。
+    
+    Args:
+        keyframes: K个EllipseSet（或形状为 (K, ellipses, fields) 的数组）
+        key_positions: K个严格递增的关键帧位置
+        interpolation: 'linear'（分段线性）或 'cubic'（自然三次样条）
+        step: 下标之间的位置间隔
+        truncate: 为True时结果向零取整为int32，否则保留浮点精度
+        cache_size: 缓存的位置数
+    """
+    
+    def __init__(self, keyframes, key_positions, interpolation='linear', step=1.0, truncate=False, 
+                 cache_size=256):
+        if interpolation not in ('linear', 'cubic'):
+            raise ValueError(f"unknown interpolation {interpolation!r}")
+        if step <= 0:
+            raise ValueError("step must be positive")
+        self.keyframes, self.key_positions = _keyframe_arrays(keyframes, key_positions)
+        self.interpolation = interpolation
+        self.step = float(step)
+        self.truncate = truncate
+        self.start = float(self.key_positions[0])
+        self.stop = float(self.key_positions[-1])
+        self._moments = None
+        if interpolation == 'cubic':
+            self._moments = spline_moments(self.keyframes, self.key_positions)
+        self._length = int(np.floor((self.stop - self.start) / self.step + 1e-9)) + 1
+        self.cache_size = cache_size
+        self.at = lru_cache(maxsize=cache_size)(self._at)
+    
+    def __getstate__(self):
+        # 缓存不能pickle，复制或反序列化后重新创建
+        state = self.__dict__.copy()
+        del state['at']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.at = lru_cache(maxsize=self.cache_size)(self._at)
+    
+    def evaluate(self, positions) -> np.ndarray:
+        """
+        一次计算多个位置，不经过缓存
+        
+        Returns:
+            形状为 (S, ellipses, fields) 的数组；truncate为True时为int32，否则为float64
+        """
+        if self.interpolation == 'cubic':
+            table = spline_ellipse_table(self.keyframes, self.key_positions, positions, self._moments)
+        else:
+            table = interpolate_ellipse_table(self.keyframes, self.key_positions, positions)
+        if self.truncate:
+            table = np.trunc(table).astype(np.int32)
+        return table
+    
+    def _at(self, position: float) -> EllipseSet:
+        data = self.evaluate([position])[0]
+        data.setflags(write=False)
+        return EllipseSet(data)
+    
+    def position(self, index: int) -> float:
+        """第index个下标对应的位置"""
+        return self.start + index * self.step
+    
+    def positions(self) -> np.ndarray:
+        """所有下标对应的位置"""
+        return self.start + np.arange(self._length) * self.step
+    
+    def __len__(self):
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EllipseTable(self.evaluate(self.positions()[index]))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("timeline index out of range")
+        return self.at(self.position(index))
+    
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+    
+    @property
+    def data(self) -> np.ndarray:
+        """所有下标处的参数，形状为 (len, ellipses, fields)；会一次计算全部位置"""
+        return self.evaluate(self.positions())
+
+
+def ellipse_timeline(left_set: EllipseSet, center_set: EllipseSet, right_set: EllipseSet, steps: int = 15,
+                     **options) -> Timeline:
+    """
+    根据-steps,0,steps三个位置的EllipseSet构建时间线
+    
+    关键帧为 left_set、center_set、center_set、right_set，位于 -steps、-1、1、steps：
+    位置-1到1之间保持center_set，两侧在相邻关键帧之间线性插值。
+    
+    Args:
+        options: 传给Timeline的其他参数（truncate、cache_size等）
+    """
+    if steps < 2:
+        raise ValueError("steps must be at least 2")
+    return Timeline(
+        [left_set, center_set, center_set, right_set],
+        [-steps, -1, 1, steps],
+        **options
+    )
+
+def init_ellipse_sets(left_set: EllipseSet, center_set: EllipseSet, right_set: EllipseSet, steps: int = 15) -> Timeline:
+    """
+    根据-steps,0,steps三个位置的EllipseSet，构建包含2*steps+1个EllipseSet的时间线
+    
+    左半部分在left_set和center_set之间均匀取steps个点（含两端），右半部分同理，
+    中间是center_set本身；插值结果向零取整。
+    """
+    return ellipse_timeline(left_set, center_set, right_set, steps, truncate=True)
 
 def print_ellipse_sets(sets: List[EllipseSet]):
     """
@@ -103,13 +332,13 @@ def print_ellipse_sets(sets: List[EllipseSet]):
     print("-" * 120)
     
     for i, set_data in enumerate(sets):
-        index = i - 15  # 将0-30的索引转换为-15到+15
+        index = i - len(sets) // 2  # 将0-30的索引转换为-15到+15
         
         # 格式化centers字符串
-        centers = f"c1{set_data.center1}, c2{set_data.center2}, c3{set_data.center3}, c4{set_data.center4}, c5{set_data.center5}"
+        centers = ", ".join(f"c{j}{getattr(set_data, f'center{j}')}" for j in range(1, set_data.count + 1))
         
         # 格式化axes字符串
-        axes = f"a1{set_data.axes1}, a2{set_data.axes2}, a3{set_data.axes3}, a4{set_data.axes4}, a5{set_data.axes5}"
+        axes = ", ".join(f"a{j}{getattr(set_data, f'axes{j}')}" for j in range(1, set_data.count + 1))
         
         # 分两行显示，第一行显示centers，第二行显示axes
         print(f"{i:>6} {index:>8} | {centers:<55} |")
@@ -132,13 +361,30 @@ right_set = EllipseSet(
     axes1=(25, 12, 1), axes2=(60, 16, 2), axes3=(90, 20, 3), axes4=(120, 28, 4), axes5=(150, 36, 5)
 )
 
-# 生成所有31个EllipseSet
+# 所有31个EllipseSet，按下标访问时才计算
 ellipse_sets = init_ellipse_sets(left_set, center_set, right_set)
+
+# 最近使用过的连续位置的缓存容量
+POSITION_CACHE_SIZE = 256
+
+# 连续位置的时间线：与ellipse_sets的关键帧相同，只是保留浮点精度
+position_timeline = ellipse_timeline(left_set, center_set, right_set, cache_size=POSITION_CACHE_SIZE)
+
+def ellipse_set_at(position: float) -> EllipseSet:
+    """
+    按需计算任意（可为小数）位置的EllipseSet，位置范围为-15到15
+    
+    与ellipse_sets不同，结果保留浮点精度，不做取整；最近使用的位置会被缓存。
+    """
+    return position_timeline.at(position)
 # print_ellipse_sets(ellipse_sets)
 
 # 访问方式：
+# 全部数据: ellipse_sets.data，形状为 (组数, 椭圆数, 字段数)
 # 第i组第j个椭圆的中心坐标: ellipse_sets[i].center{j}
 # 第i组第j个椭圆的轴信息: ellipse_sets[i].axes{j}
 # 第i组第j个椭圆的长轴: ellipse_sets[i].axes{j}[0]
 # 第i组第j个椭圆的短轴: ellipse_sets[i].axes{j}[1]
 # 第i组第j个椭圆的自定义参数: ellipse_sets[i].axes{j}[2]
+# 任意小数位置p的椭圆组: ellipse_set_at(p).center{j}
+# 任意多个关键帧的平滑时间线: Timeline(keyframes, key_positions, interpolation='cubic', step=0.25)
@@ -0,0 +1,195 @@
+"""
+预先渲染的帧包
+
+把动画的所有状态渲染到一个文件中，播放时用np.memmap映射，直接取出切片显示，
+不做任何渐变计算；多个播放进程共享操作系统的页缓存。
+
+文件格式：
+    8字节    MAGIC
+    4字节    头部长度（小端uint32）
+    头部     UTF-8 JSON：version、params_hash、dtype、frame_shape、keys、metadata
+    填充     到ALIGNMENT的整数倍
+    帧数据   len(keys)帧，C顺序连续存放
+
+头部中的params_hash由渲染参数计算，参数变化后与播放端重新计算的值不一致，
+据此识别过期的帧包。
+
+示例：
+    python frame_bundle.py ellipse_animation.bundle --substeps 8
+    python ellipse_animation.py --bundle ellipse_animation.bundle
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'FRMBNDL1'
+VERSION = 1
+# 帧数据的起始位置按页对齐
+ALIGNMENT = 4096
+
+_LENGTH = struct.Struct('<I')
+
+
+def params_hash(*parts):
+    """
+    计算渲染参数的哈希（十六进制字符串）
+
+    数组按dtype、形状和原始字节计入，其他值按repr计入。
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(repr((part.dtype.str, part.shape)).encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _encode_key(key):
+    return list(map(_encode_key, key)) if isinstance(key, tuple) else key
+
+
+def _decode_key(key):
+    return tuple(map(_decode_key, key)) if isinstance(key, list) else key
+
+
+def _data_offset(header_length):
+    return -(-(len(MAGIC) + _LENGTH.size + header_length) // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(path, frames, keys, frame_shape, params_hash, dtype=np.uint8, metadata=None):
+    """
+    把frames逐帧写入帧包
+
+    先写入临时文件，完成后再替换path，播放中的进程不会读到写了一半的文件。
+    帧逐个写入映射的文件，内存占用与帧数无关。
+
+    Args:
+        path: 输出文件
+        frames: 与keys一一对应的帧（可迭代对象，可以是生成器）
+        keys: 每帧的键，由整数、浮点数、字符串和元组组成
+        frame_shape: 每帧的形状
+        params_hash: 渲染参数的哈希
+        dtype: 帧的数据类型
+        metadata: 可选的附加信息（可JSON序列化的dict），如生成帧包时的参数
+    """
+    keys = list(keys)
+    frame_shape = tuple(frame_shape)
+    dtype = np.dtype(dtype)
+    header = json.dumps({
+        'version': VERSION,
+        'params_hash': params_hash,
+        'dtype': dtype.str,
+        'frame_shape': frame_shape,
+        'keys': [_encode_key(key) for key in keys],
+        'metadata': metadata or {},
+    }).encode('utf-8')
+    offset = _data_offset(len(header))
+    shape = (len(keys),) + frame_shape
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(header)))
+        f.write(header)
+        f.truncate(offset + int(np.prod(shape)) * dtype.itemsize)
+
+    count = 0
+    if keys:
+        data = np.memmap(temp_path, dtype=dtype, mode='r+', offset=offset, shape=shape)
+        for count, frame in enumerate(frames, 1):
+            if count > len(keys):
+                break
+            data[count - 1] = frame
+        data.flush()
+        del data
+    if count != len(keys):
+        os.remove(temp_path)
+        raise ValueError(f"expected {len(keys)} frames, got {count}")
+    os.replace(temp_path, path)
+
+
+class FrameBundle:
+    """
+    以只读内存映射打开的帧包
+
+    bundle[i] 返回第i帧，bundle.get(key) 按键查找，未包含该键时返回None；
+    bundle.metadata 是写入时的附加信息。
+    返回的帧都是映射文件的只读视图，不复制数据。
+
+    Args:
+        path: 帧包文件
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a frame bundle")
+            try:
+                (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                header = json.loads(f.read(length).decode('utf-8'))
+            except struct.error:
+                raise ValueError(f"{path} is truncated") from None
+        try:
+            if header['version'] != VERSION:
+                raise ValueError(f"unsupported frame bundle version {header['version']}")
+            self.params_hash = header['params_hash']
+            self.keys = [_decode_key(key) for key in header['keys']]
+            self.frame_shape = tuple(header['frame_shape'])
+            dtype = np.dtype(header['dtype'])
+            self.metadata = dict(header.get('metadata', {}))
+        except (KeyError, TypeError) as error:
+            raise ValueError(f"{path} has an invalid header ({error!r})") from None
+        offset = _data_offset(length)
+        shape = (len(self.keys),) + self.frame_shape
+        if os.path.getsize(path) < offset + int(np.prod(shape)) * dtype.itemsize:
+            raise ValueError(f"{path} is truncated")
+
+        self.frames = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape) if self.keys else None
+        self._index = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, i):
+        return self.frames[i]
+
+    def get(self, key):
+        i = self._index.get(key)
+        return None if i is None else self.frames[i]
+
+    def is_stale(self, params_hash):
+        """帧包是否由不同的渲染参数生成"""
+        return self.params_hash != params_hash
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="为ellipse_animation预先渲染帧包")
+    parser.add_argument('output', help="输出文件")
+    parser.add_argument('--substeps', type=int, default=None,
+                        help="每个整数位置之间的小数位置数（默认与自动移动一致，0表示只包含整数组）")
+    args = parser.parse_args(argv)
+
+    import ellipse_animation as animation
+    substeps = animation.AUTO_MOVE_SUBSTEPS if args.substeps is None else args.substeps
+
+    start = time.perf_counter()
+    count = animation.build_frame_bundle(args.output, substeps)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.output)
+    print(f"wrote {count} frames ({size / 2 ** 20:.1f} MiB) to {args.output} in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
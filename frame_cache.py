@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+
+class FrameCache:
+    """有容量上限的LRU帧缓存
+
+    以渲染参数构成的可哈希键缓存渲染结果，帧数超过maxsize或总字节数超过maxbytes时
+    淘汰最久未使用的帧（至少保留最新的一帧）。
+    缓存中的数组被设置为只读，调用方需要修改时应先复制。
+    可以在多个线程中同时使用；渲染本身在锁外进行。
+    """
+
+    def __init__(self, maxsize=64, maxbytes=None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if maxbytes is not None and maxbytes <= 0:
+            raise ValueError("maxbytes must be positive")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def get(self, key):
+        """查找缓存帧，未命中时返回None"""
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key, frame):
+        """写入缓存帧，必要时淘汰最久未使用的帧"""
+        frame.setflags(write=False)
+        with self._lock:
+            old = self._frames.get(key)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            self.nbytes += frame.nbytes
+            while len(self._frames) > 1 and (
+                    len(self._frames) > self.maxsize
+                    or (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+                self.nbytes -= self._frames.popitem(last=False)[1].nbytes
+        return frame
+
+    def get_or_render(self, key, render):
+        """命中时直接返回缓存帧，否则调用render()渲染并写入缓存"""
+        frame = self.get(key)
+        if frame is None:
+            frame = self.put(key, render())
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
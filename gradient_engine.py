@@ -0,0 +1,402 @@
+import threading
+
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# 每个计算条带中 (环数 x 行数 x 列数) 的元素上限，用于限制临时缓冲区的大小
+BAND_ELEMENTS = 1 << 21
+
+# 逐环累加模式下每个 (行数 x 列数) 缓冲区的元素上限；条带较小时各缓冲区可以留在缓存中
+STREAM_BAND_ELEMENTS = 1 << 18
+
+# 融合计算模式：NumPy分块计算时每块的元素上限（使各缓冲区留在一级/二级缓存中），
+# 以及用numexpr时一个表达式中最多的环数（超过时改用NumPy分块计算）
+FUSED_BLOCK_ELEMENTS = 1 << 14
+NUMEXPR_MAX_RINGS = 12
+
+
+class Workspace:
+    """按名称复用的临时缓冲区
+
+    每个名称对应一块一维缓冲区，请求的尺寸不超过其容量时直接返回其视图，
+    否则重新分配。同一个Workspace不能在多个线程间同时使用。
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape, dtype=np.float32):
+        """获取指定形状和类型的缓冲区，内容未初始化"""
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.size < count:
+            buffer = np.empty(count, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:count].reshape(shape)
+
+    def ramp(self, count):
+        """返回float32的 0, 1, ..., count-1，内容在多次调用之间保持不变"""
+        ramp = self._buffers.get('__ramp__')
+        if ramp is None or ramp.size < count:
+            ramp = np.arange(count, dtype=np.float32)
+            self._buffers['__ramp__'] = ramp
+        return ramp[:count]
+
+    def clear(self):
+        self._buffers.clear()
+
+
+_local = threading.local()
+
+
+def default_workspace():
+    """返回当前线程的默认Workspace"""
+    workspace = getattr(_local, 'workspace', None)
+    if workspace is None:
+        workspace = _local.workspace = Workspace()
+    return workspace
+
+
+def common_center(values):
+    """values全部相等且为整数时返回该整数，否则返回None"""
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    if len(values) == 0 or not np.all(values == values[0]) or not float(values[0]).is_integer():
+        return None
+    return int(values[0])
+
+
+def mirror_axis(out, axis, center, render_part):
+    """
+    利用关于整数坐标center的镜像对称，只计算一半，另一半由镜像复制得到
+
+    center一侧 [center, size) 完整计算；另一侧在画布内有镜像对应的部分直接复制，
+    没有对应的部分（center靠近画布边缘时）单独计算。
+
+    Args:
+        out: 输出数组
+        axis: 镜像的维度，0为行（关于y=center），1为列（关于x=center）
+        center: 对称轴的坐标
+        render_part: render_part(start, stop)计算该维度上 [start, stop) 的部分并写入out
+
+    Returns:
+        center不在画布内部、无法利用对称时返回False，此时不做任何计算
+    """
+    size = out.shape[axis]
+    if center is None or not 0 < center < size - 1:
+        return False
+    render_part(center, size)
+    low = max(2 * center - size + 1, 0)
+    if low > 0:
+        render_part(0, low)
+
+    target = [slice(None)] * out.ndim
+    source = [slice(None)] * out.ndim
+    target[axis] = slice(low, center)
+    source[axis] = slice(2 * center - low, center, -1)
+    out[tuple(target)] = out[tuple(source)]
+    return True
+
+
+def ring_arrays(centers, axes, brightnesses, scales=None):
+    """把各环参数整理为float32数组
+
+    Args:
+        centers: N个(x, y)中心
+        axes: N个轴参数，可以是半径r、(a, b)或(left_a, right_a, b)
+        brightnesses: N个亮度值
+        scales: N个边界距离的缩放系数，默认为1（即使用归一化距离）
+
+    Returns:
+        (cx, cy, left, right, axis_y, brightness, scale)，均为长度N的数组
+    """
+    centers = np.asarray(centers, dtype=np.float32).reshape(-1, 2)
+    axes = np.asarray(axes, dtype=np.float32)
+    if axes.ndim == 1:
+        axes = axes[:, None]
+    if axes.shape[1] == 1:
+        left = right = axis_y = axes[:, 0]
+    elif axes.shape[1] == 2:
+        left = right = axes[:, 0]
+        axis_y = axes[:, 1]
+    elif axes.shape[1] == 3:
+        left, right, axis_y = axes[:, 0], axes[:, 1], axes[:, 2]
+    else:
+        raise ValueError("axes must be r, (a, b) or (left_a, right_a, b) per ring")
+
+    count = len(centers)
+    brightness = np.asarray(brightnesses, dtype=np.float32).reshape(-1)
+    if scales is None:
+        scale = np.ones(count, dtype=np.float32)
+    else:
+        scale = np.asarray(scales, dtype=np.float32).reshape(-1)
+    if not (len(left) == len(brightness) == len(scale) == count):
+        raise ValueError("centers, axes, brightnesses and scales must have the same length")
+
+    return centers[:, 0], centers[:, 1], left, right, axis_y, brightness, scale
+
+
+def create_boundary_blend_gradient(
+    size,
+    centers,
+    axes,
+    brightnesses,
+    scales=None,
+    out=None,
+    workspace=None,
+    boundary_table=None,
+    symmetry=True,
+    streaming=False,
+    fused=False
+):
+    """按到各椭圆边界的距离加权混合亮度，N个环一次批量计算
+
+    第0个环为最外层，最后一个环为最内层；有效区域为最外层之内、最内层之外。
+    有效区域内每个点的亮度为 sum(b_i * d_i) / sum(d_i)，其中d_i为点到第i个
+    椭圆边界的距离 |1 - rho_i| * scale_i，rho_i为点到第i个中心的归一化距离。
+    x方向上中心左侧（含中心所在列）使用left_a，右侧使用right_a。
+
+    Args:
+        size: (height, width) 画布尺寸
+        centers: N个(x, y)中心
+        axes: N个轴参数，可以是半径r、(a, b)或(left_a, right_a, b)
+        brightnesses: N个亮度值
+        scales: N个边界距离的缩放系数，默认为1；传入半径即得到以像素计的距离
+        out: 可选的float32输出数组，形状为size
+        workspace: 复用临时缓冲区的Workspace，默认为当前线程的Workspace
+        boundary_table: 可选的BoundaryBlendProfile查找表（见radial_profiles.boundary_table），
+                        给出时边界距离由查表得到，不再逐像素开方；结果与精确计算的差
+                        由表的误差和各环的scale决定
+        symmetry: 所有中心的y（或x，且左右半轴相等）相同且为整数时，只计算对称轴
+                  一侧，另一侧镜像复制，结果不变
+        streaming: 逐环累加总距离与亮度加权和，临时缓冲区的数量与环数无关，
+                   峰值内存不随环数增长；默认一次批量计算所有环
+        fused: 融合计算，每个像素的完整表达式在一次遍历中算完，不产生整幅的临时数组。
+               True时安装了numexpr则用numexpr，否则用NumPy按缓存大小的小块逐环计算；
+               也可以用'numexpr'或'numpy'指定。结果与默认模式相差在float32舍入误差内
+    """
+    cx, cy, left, right, axis_y, brightness, scale = ring_arrays(
+        centers, axes, brightnesses, scales
+    )
+    height, width = size
+    count = len(cx)
+
+    if out is None:
+        out = np.zeros((height, width), dtype=np.float32)
+    if workspace is None:
+        workspace = default_workspace()
+
+    if symmetry:
+        def render_part(axis, start, stop):
+            shift = np.zeros(2, dtype=np.float32)
+            shift[1 - axis] = start
+            part_size = (stop - start, width) if axis == 0 else (height, stop - start)
+            part = out[start:stop] if axis == 0 else out[:, start:stop]
+            create_boundary_blend_gradient(
+                part_size,
+                np.stack([cx, cy], axis=1) - shift,
+                np.stack([left, right, axis_y], axis=1),
+                brightness,
+                scale,
+                out=part,
+                workspace=workspace,
+                boundary_table=boundary_table,
+                streaming=streaming,
+                fused=fused
+            )
+
+        center_x = common_center(cx) if np.array_equal(left, right) else None
+        if (mirror_axis(out, 0, common_center(cy), lambda a, b: render_part(0, a, b))
+                or mirror_axis(out, 1, center_x, lambda a, b: render_part(1, a, b))):
+            return out
+
+    out[...] = 0
+
+    # x方向的归一化距离平方只与列有关，预先为所有环计算 (N, W)
+    x = np.arange(width, dtype=np.float32)
+    x_dist = workspace.get('x_dist', (count, width))
+    np.subtract(x[None, :], cx[:, None], out=x_dist)
+    x_radius = np.where(x_dist <= 0, left[:, None], right[:, None])
+    x_norm2 = workspace.get('x_norm2', (count, width))
+    np.divide(x_dist, x_radius, out=x_norm2)
+    np.multiply(x_norm2, x_norm2, out=x_norm2)
+
+    if fused:
+        backend = fused_backend(fused, count, boundary_table)
+        if backend == 'numexpr':
+            _blend_numexpr(out, cy, axis_y, brightness, scale, x_norm2)
+        else:
+            _blend_streaming(out, cy, axis_y, brightness, scale, x_norm2, workspace, boundary_table,
+                             block=FUSED_BLOCK_ELEMENTS)
+        return out
+
+    if streaming:
+        _blend_streaming(out, cy, axis_y, brightness, scale, x_norm2, workspace, boundary_table)
+        return out
+
+    band = max(1, min(height, BAND_ELEMENTS // max(count * width, 1)))
+    for row0 in range(0, height, band):
+        row1 = min(row0 + band, height)
+        rows = row1 - row0
+
+        # y方向的归一化距离平方 (N, rows)
+        y = np.arange(row0, row1, dtype=np.float32)
+        y_norm2 = workspace.get('y_norm2', (count, rows))
+        np.subtract(y[None, :], cy[:, None], out=y_norm2)
+        np.divide(y_norm2, axis_y[:, None], out=y_norm2)
+        np.multiply(y_norm2, y_norm2, out=y_norm2)
+
+        # 所有环的归一化距离 (N, rows, W)
+        rho = workspace.get('rho', (count, rows, width))
+        np.add(y_norm2[:, :, None], x_norm2[:, None, :], out=rho)
+        if boundary_table is None:
+            np.sqrt(rho, out=rho)
+
+        # 有效区域：在最外层椭圆内，不在最内层椭圆内（与1比较时开方与否结果相同）
+        valid = workspace.get('valid', (rows, width), dtype=bool)
+        inner_valid = workspace.get('inner_valid', (rows, width), dtype=bool)
+        np.less_equal(rho[0], 1, out=valid)
+        np.greater_equal(rho[-1], 1, out=inner_valid)
+        np.logical_and(valid, inner_valid, out=valid)
+        if not valid.any():
+            continue
+
+        # 到各椭圆边界的距离
+        if boundary_table is None:
+            np.subtract(1, rho, out=rho)
+            np.abs(rho, out=rho)
+        else:
+            boundary_table.lookup(rho, out=rho, workspace=workspace)
+        np.multiply(rho, scale[:, None, None], out=rho)
+
+        # 总距离与亮度加权和
+        total = workspace.get('total', (rows, width))
+        weighted = workspace.get('weighted', (rows, width))
+        np.sum(rho, axis=0, out=total)
+        np.einsum('n,nrw->rw', brightness, rho, out=weighted)
+
+        # 所有边界重合的点（如单个环的边界上）总距离为0，保持为0
+        np.greater(total, 0, out=inner_valid)
+        np.logical_and(valid, inner_valid, out=valid)
+
+        np.divide(weighted, total, out=out[row0:row1], where=valid)
+
+    return out
+
+
+def _ring_distance(ring, y, cy, axis_y, x_norm2, out, boundary_table=None):
+    """第ring个环在y各行上的归一化距离（查表时为到边界的距离），写入out (rows, W)"""
+    y_norm2 = np.subtract(y, cy[ring])
+    np.divide(y_norm2, axis_y[ring], out=y_norm2)
+    np.multiply(y_norm2, y_norm2, out=y_norm2)
+    np.add(y_norm2[:, None], x_norm2[ring][None, :], out=out)
+    if boundary_table is None:
+        np.sqrt(out, out=out)
+    return out
+
+
+def _blend_streaming(out, cy, axis_y, brightness, scale, x_norm2, workspace, boundary_table,
+                     block=STREAM_BAND_ELEMENTS):
+    """
+    逐环累加的边界混合，每块只使用固定数量的缓冲区
+
+    每块为若干行（列数不超过block时）或一行中的一段，元素数不超过block。
+    """
+    height, width = out.shape
+    columns = min(width, block)
+    band = max(1, min(height, block // max(columns, 1)))
+    for row0 in range(0, height, band):
+        row1 = min(row0 + band, height)
+        for col0 in range(0, width, columns):
+            col1 = min(col0 + columns, width)
+            _blend_streaming_block(out[row0:row1, col0:col1], row0, cy, axis_y, brightness, scale,
+                                   x_norm2[:, col0:col1], workspace, boundary_table)
+
+
+def _blend_streaming_block(out, row0, cy, axis_y, brightness, scale, x_norm2, workspace, boundary_table):
+    """计算从第row0行开始的一块（x_norm2为该块各列的部分）"""
+    rows, width = out.shape
+    count = len(cy)
+    y = np.arange(row0, row0 + rows, dtype=np.float32)
+    rho = workspace.get('stream_rho', (rows, width))
+
+    # 有效区域：在最外层椭圆内，不在最内层椭圆内
+    valid = workspace.get('valid', (rows, width), dtype=bool)
+    inner_valid = workspace.get('inner_valid', (rows, width), dtype=bool)
+    np.less_equal(_ring_distance(0, y, cy, axis_y, x_norm2, rho, boundary_table), 1, out=valid)
+    np.greater_equal(_ring_distance(count - 1, y, cy, axis_y, x_norm2, rho, boundary_table), 1,
+                     out=inner_valid)
+    np.logical_and(valid, inner_valid, out=valid)
+    if not valid.any():
+        return
+
+    # 逐环累加总距离与亮度加权和
+    total = workspace.get('total', (rows, width))
+    weighted = workspace.get('weighted', (rows, width))
+    term = workspace.get('stream_term', (rows, width))
+    total[...] = 0
+    weighted[...] = 0
+    for ring in range(count):
+        _ring_distance(ring, y, cy, axis_y, x_norm2, rho, boundary_table)
+        if boundary_table is None:
+            np.subtract(1, rho, out=rho)
+            np.abs(rho, out=rho)
+        else:
+            boundary_table.lookup(rho, out=rho, workspace=workspace)
+        np.multiply(rho, scale[ring], out=rho)
+        total += rho
+        np.multiply(rho, brightness[ring], out=term)
+        weighted += term
+
+    np.greater(total, 0, out=inner_valid)
+    np.logical_and(valid, inner_valid, out=valid)
+
+    np.divide(weighted, total, out=out, where=valid)
+
+
+def fused_backend(fused=True, count=0, boundary_table=None):
+    """
+    返回融合计算实际使用的后端名称，'numexpr'或'numpy'
+
+    未安装numexpr、环数超过NUMEXPR_MAX_RINGS或使用查找表时用NumPy分块计算。
+    """
+    if fused == 'numpy' or numexpr is None or boundary_table is not None or count > NUMEXPR_MAX_RINGS:
+        return 'numpy'
+    return 'numexpr'
+
+
+def _blend_numexpr(out, cy, axis_y, brightness, scale, x_norm2):
+    """用numexpr把有效区域判断、各环的边界距离与加权平均合成一个表达式，逐条带计算"""
+    height, width = out.shape
+    count = len(cy)
+
+    # 标量也以float32变量传入，避免numexpr把整个表达式提升为双精度
+    distances = [f"abs(1 - sqrt(y{i} + x{i})) * s{i}" for i in range(count)]
+    total = " + ".join(distances)
+    weighted = " + ".join(f"b{i} * {distances[i]}" for i in range(count))
+    last = count - 1
+    expression = f"where((y0 + x0 <= 1) & (y{last} + x{last} >= 1), ({weighted}) / ({total}), 0)"
+
+    constants = {}
+    for i in range(count):
+        constants[f"b{i}"] = np.float32(brightness[i])
+        constants[f"s{i}"] = np.float32(scale[i])
+
+    band = max(1, min(height, BAND_ELEMENTS // max(width, 1)))
+    for row0 in range(0, height, band):
+        row1 = min(row0 + band, height)
+        y = np.arange(row0, row1, dtype=np.float32)
+        variables = dict(constants)
+        for i in range(count):
+            y_norm = (y - cy[i]) / axis_y[i]
+            variables[f"y{i}"] = (y_norm * y_norm)[:, None]
+            variables[f"x{i}"] = x_norm2[i][None, :]
+        part = out[row0:row1]
+        numexpr.evaluate(expression, local_dict=variables, out=part, casting='unsafe')
+
+        # 所有边界重合的点总距离为0，0/0得到的NaN保持为0
+        np.copyto(part, 0, where=np.isnan(part))
@@ -1,7 +1,11 @@
 import cv2
 import numpy as np
+from gradient_engine import create_boundary_blend_gradient
+from radial_profiles import LinearRingProfile, profile_table, render_profile
+from profiling import maybe_profile
+from render_loop import run_event_loop
 
-def create_ring_gradient(size, center, inner_radius, outer_radius, brightness):
+def create_ring_gradient(size, center, inner_radius, outer_radius, brightness, lut_error=None):
     """创建单个圆环渐变
     
     Args:
@@ -10,29 +14,24 @@ def create_ring_gradient(size, center, inner_radius, outer_radius, brightness):
         inner_radius: 内圆半径
         outer_radius: 外圆半径
         brightness: 边界亮度值 (0-1)
+        lut_error: 给出时按线性圆环剖面的查找表渲染，结果与精确计算相差不超过该值
     """
-    canvas = np.zeros(size, dtype=np.float32)
-    y, x = np.ogrid[:size[0], :size[1]]
+    if lut_error is not None:
+        table = profile_table(
+            LinearRingProfile(inner_radius / outer_radius, brightness),
+            max_error=lut_error
+        )
+        return render_profile(size, center, (outer_radius, outer_radius), table)
     
-    # 计算到中心点的距离
-    dist_from_center = np.sqrt((x - center[0])**2 + (y - center[1])**2)
-    
-    # 只在两个圆之间的区域创建渐变
-    ring_mask = (dist_from_center >= inner_radius) & (dist_from_center <= outer_radius)
-    
-    if ring_mask.any():
-        # 在每条射线上创建渐变
-        gradient = np.zeros_like(dist_from_center)
-        valid_points = ring_mask
-        
-        # 计算从内圆到外圆的线性渐变
-        gradient[valid_points] = (dist_from_center[valid_points] - inner_radius) / (outer_radius - inner_radius)
-        
-        # 在外圆处亮度最大，向内圆渐变到0
-        gradient = (1 - gradient) * brightness
-        canvas[valid_points] = gradient[valid_points]
-    
-    return canvas
+    # 线性渐变即外圆、内圆两个边界之间按像素距离的混合：
+    # 外圆使用给定亮度，内圆亮度为0
+    return create_boundary_blend_gradient(
+        size,
+        centers=[center, center],
+        axes=[outer_radius, inner_radius],
+        brightnesses=[brightness, 0],
+        scales=[outer_radius, inner_radius]
+    )
 
 def draw_frame():
     # 创建黑色画布 (480, 640)
@@ -51,20 +50,13 @@ def draw_frame():
     return ring
 
 def main():
+    if maybe_profile('gradient_rings', lambda index: draw_frame()):
+        return
+    
     window_name = 'Gradient Ring'
     cv2.namedWindow(window_name)
     
-    while True:
-        # 绘制帧
-        frame = draw_frame()
-        
-        # 显示帧
-        cv2.imshow(window_name, frame)
-        
-        # 检查退出
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+    run_event_loop(window_name, draw_frame)
     
     cv2.destroyAllWindows()
 
@@ -0,0 +1,150 @@
+import cv2
+import numpy as np
+
+
+class HudOverlay:
+    """
+    HUD覆盖层
+
+    文字、边框等元素只在内容变化时光栅化，光栅化时记录下元素覆盖的像素位置
+    和覆盖率（即预先计算的mask），每帧只需把这些像素写入画面。适用于uint8或
+    float32、单通道或三通道的画面，颜色需与画面的类型对应。
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        # 元素名 -> {'draw', 'bounds', 'color', 'value', 以及光栅化得到的像素}
+        self.elements = {}
+        # 所有元素像素的合并结果，元素重新光栅化后失效
+        self._merged = None
+
+    def add_rectangle(self, name, pt1, pt2, color, thickness=1):
+        """添加矩形边框"""
+        pad = thickness + 1
+
+        def bounds(value):
+            return (min(pt1[0], pt2[0]) - pad, min(pt1[1], pt2[1]) - pad,
+                    max(pt1[0], pt2[0]) + pad + 1, max(pt1[1], pt2[1]) + pad + 1)
+
+        def draw(image, offset, draw_color, value):
+            cv2.rectangle(image,
+                          (pt1[0] - offset[0], pt1[1] - offset[1]),
+                          (pt2[0] - offset[0], pt2[1] - offset[1]),
+                          draw_color,
+                          thickness)
+
+        self._add(name, draw, bounds, color, None)
+
+    def add_text(self, name, org, font_scale, color, text='',
+                 font=cv2.FONT_HERSHEY_SIMPLEX, thickness=1):
+        """添加文字字段，之后可以用set_text更新内容"""
+        pad = 2 * thickness + 2
+
+        def bounds(value):
+            (width, height), baseline = cv2.getTextSize(value, font, font_scale, thickness)
+            return (org[0] - pad, org[1] - height - pad,
+                    org[0] + width + pad, org[1] + baseline + pad)
+
+        def draw(image, offset, draw_color, value):
+            cv2.putText(image,
+                        value,
+                        (org[0] - offset[0], org[1] - offset[1]),
+                        font,
+                        font_scale,
+                        draw_color,
+                        thickness)
+
+        self._add(name, draw, bounds, color, text)
+
+    def set_text(self, name, text):
+        """更新文字字段，内容未变化时不做任何事"""
+        if self.elements[name]['value'] != text:
+            self._rasterize(self.elements[name], text)
+
+    def rects(self):
+        """各元素当前覆盖的区域 (x0, y0, x1, y1) 列表，不在画面内的元素除外"""
+        return [element['rect'] for element in self.elements.values() if element['rect'] is not None]
+
+    def composite(self, frame):
+        """把各元素的像素写入frame（原地修改），frame须为与覆盖层形状一致的连续数组
+
+        完全覆盖的像素直接写入；抗锯齿边缘的像素按覆盖率与画面混合，
+        背景为黑色时结果与直接在画面上绘制一致。
+        """
+        if self._merged is None:
+            self._merged = {
+                key: np.concatenate([element[key] for element in self.elements.values()])
+                for key in ('indices', 'pixels', 'edge_indices', 'edge_pixels', 'edge_keep')
+            }
+        merged = self._merged
+
+        # 按元素（含通道）展平后的一维索引读写
+        flat = frame.reshape(-1)
+        flat[merged['indices']] = merged['pixels']
+        if len(merged['edge_indices']):
+            blended = flat.take(merged['edge_indices']).astype(np.float32)
+            blended *= merged['edge_keep']
+            blended += merged['edge_pixels']
+            if self.dtype.kind in 'ui':
+                blended += 0.5
+                np.minimum(blended, np.iinfo(self.dtype).max, out=blended)
+            flat[merged['edge_indices']] = blended
+        return frame
+
+    def _add(self, name, draw, bounds, color, value):
+        element = {'draw': draw, 'bounds': bounds, 'color': color, 'value': None}
+        self.elements[name] = element
+        self._rasterize(element, value)
+
+    def _rasterize(self, element, value):
+        self._merged = None
+        element['value'] = value
+        rect = element['rect'] = self._clip(element['bounds'](value))
+        if rect is None:
+            coverage = np.zeros((0, 0), dtype=np.uint8)
+            x0 = y0 = 0
+        else:
+            x0, y0, x1, y1 = rect
+            # 在元素大小的缓冲区中以255绘制，得到每个像素的覆盖率
+            coverage = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            element['draw'](coverage, (x0, y0), 255, value)
+
+        if self.dtype == np.uint8:
+            # 直接取黑色背景上绘制出的颜色，与在画面上绘制的结果一致
+            local = np.zeros(coverage.shape + self.shape[2:], dtype=np.uint8)
+            if local.size:
+                element['draw'](local, (x0, y0), element['color'], value)
+        else:
+            alpha = coverage.astype(np.float32) / 255
+            if self.shape[2:]:
+                alpha = alpha[:, :, None]
+            local = alpha * self._color(element['color'])
+
+        # 完全覆盖的像素与抗锯齿边缘的像素分开保存，索引展开到每个通道
+        channels = self.shape[2] if len(self.shape) > 2 else 1
+        offsets = np.arange(channels)
+        edge = (coverage > 0) & (coverage < 255)
+        for prefix, selected in (('', coverage == 255), ('edge_', edge)):
+            ys, xs = np.nonzero(selected)
+            pixel_indices = (ys + y0) * self.shape[1] + (xs + x0)
+            element[prefix + 'indices'] = (pixel_indices[:, None] * channels + offsets).reshape(-1)
+            element[prefix + 'pixels'] = local[selected].reshape(-1)
+        element['edge_pixels'] = element['edge_pixels'].astype(np.float32)
+        keep = 1 - coverage[edge].astype(np.float32) / 255
+        element['edge_keep'] = np.repeat(keep, channels)
+
+    def _color(self, color):
+        channels = self.shape[2:]
+        color = np.asarray(color, dtype=np.float32).reshape(-1)
+        if channels:
+            return color[:channels[0]]
+        return color[0]
+
+    def _clip(self, rect):
+        height, width = self.shape[:2]
+        x0, y0 = max(rect[0], 0), max(rect[1], 0)
+        x1, y1 = min(rect[2], width), min(rect[3], height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
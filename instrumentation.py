@@ -0,0 +1,109 @@
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# 每个阶段保留的最近样本数，统计量按这些样本滚动计算
+DEFAULT_WINDOW = 240
+
+# 关闭时所有阶段共用的空上下文
+_DISABLED = nullcontext()
+
+
+class _Stage:
+    """计时一个阶段的上下文管理器，退出时把耗时记入所属的Instrumentation"""
+
+    __slots__ = ('owner', 'name', 'start')
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.owner.record(self.name, time.perf_counter() - self.start)
+
+
+class Instrumentation:
+    """
+    按名称记录各阶段的耗时，给出最近样本的p50/p95/p99
+
+    用法：
+        with instrumentation.stage('render'):
+            ...
+    关闭时stage()返回共用的空上下文，不读时钟也不记录，开销只有一次方法调用。
+
+    Args:
+        enabled: 是否记录
+        window: 每个阶段保留的最近样本数
+    """
+
+    def __init__(self, enabled=False, window=DEFAULT_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.samples = {}
+        self.frame_times = deque(maxlen=window)
+
+    def stage(self, name):
+        """返回计时name阶段的上下文管理器"""
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def frame(self):
+        """标记一帧显示完成，用于计算帧率"""
+        if self.enabled:
+            self.frame_times.append(time.perf_counter())
+
+    def fps(self):
+        """最近样本的平均帧率，样本不足时返回0"""
+        if len(self.frame_times) < 2:
+            return 0.0
+        elapsed = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        """各阶段的统计量（毫秒）：{name: {count, mean, p50, p95, p99, max}}"""
+        result = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            ms = np.array(samples) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            result[name] = {
+                'count': len(ms),
+                'mean': float(ms.mean()),
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': float(ms.max()),
+            }
+        return result
+
+    def summary(self, name):
+        """单行摘要，如 "FPS 59.8  frame p50/p95/p99 1.2/1.9/3.1 ms" """
+        line = f"FPS {self.fps():.1f}"
+        stats = self.stats().get(name)
+        if stats is not None:
+            line += f"  {name} p50/p95/p99 {stats['p50']:.1f}/{stats['p95']:.1f}/{stats['p99']:.1f} ms"
+        return line
+
+    def dump(self, path):
+        """把统计量写入JSON文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'fps': self.fps(), 'stages': self.stats()}, f, indent=2)
+
+    def reset(self):
+        self.samples.clear()
+        self.frame_times.clear()
@@ -0,0 +1,50 @@
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class FramePrefetcher:
+    """
+    在后台线程中预先渲染接下来可能显示的帧
+
+    render(key) 负责渲染并保存结果（通常写入FrameCache）；显示循环在使用某个键之前
+    调用wait(key)，若该帧正在后台渲染则等待其完成，之后直接从缓存中取得。
+    NumPy运算会释放GIL，因此后台渲染与显示循环可以并行。
+    schedule/wait/cancel只应在显示循环所在的线程中调用。
+    """
+
+    def __init__(self, render, workers=1):
+        self.render = render
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+        # 键 -> Future，按提交顺序排列
+        self._pending = {}
+
+    def schedule(self, keys):
+        """预取keys中的帧；不再需要的尚未开始的任务会被取消"""
+        keys = list(keys)
+        wanted = set(keys)
+        for key, future in list(self._pending.items()):
+            if key not in wanted:
+                future.cancel()
+                del self._pending[key]
+        for key in keys:
+            if key not in self._pending:
+                self._pending[key] = self._executor.submit(self.render, key)
+
+    def wait(self, key):
+        """若key正在后台渲染则等待其完成；未预取或已取消时立即返回"""
+        future = self._pending.pop(key, None)
+        if future is None:
+            return
+        try:
+            future.result()
+        except CancelledError:
+            pass
+
+    def cancel(self):
+        """取消所有尚未开始的预取任务"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,160 @@
+"""
+可选的性能剖析
+
+各场景脚本的main()在启动窗口之前调用maybe_profile()。设置了环境变量
+ELLIPSE_PROFILE或带有命令行参数--profile时，不打开窗口，而是连续绘制N帧，
+用cProfile记录CPU耗时、用tracemalloc记录每帧的内存分配，把报告写入目录。
+
+示例：
+    ELLIPSE_PROFILE=reports ELLIPSE_PROFILE_FRAMES=50 python ellipse_animation.py
+    python quintuple_asymmetric_ellipses.py --profile reports --profile-frames 20
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+# 环境变量：报告目录（设为1时使用DEFAULT_DIR）与帧数
+PROFILE_ENV = 'ELLIPSE_PROFILE'
+FRAMES_ENV = 'ELLIPSE_PROFILE_FRAMES'
+DEFAULT_DIR = 'profile_reports'
+DEFAULT_FRAMES = 30
+
+# 报告中列出的函数与分配位置的条数
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+def profile_options(argv=None):
+    """
+    从命令行参数和环境变量中读取剖析设置
+
+    Returns:
+        (报告目录, 帧数)，未要求剖析时返回None
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_DIR)
+    parser.add_argument('--profile-frames', type=int)
+    args, _ = parser.parse_known_args(argv)
+
+    out_dir = args.profile
+    if out_dir is None:
+        value = os.environ.get(PROFILE_ENV, '')
+        if value in ('', '0'):
+            return None
+        out_dir = DEFAULT_DIR if value == '1' else value
+
+    frames = args.profile_frames
+    if frames is None:
+        frames = int(os.environ.get(FRAMES_ENV, DEFAULT_FRAMES))
+    return out_dir, frames
+
+
+def profile_frames(name, draw_frame, frames=DEFAULT_FRAMES, out_dir=DEFAULT_DIR, reset=None):
+    """
+    剖析连续绘制frames帧的CPU耗时与内存分配，报告写入out_dir
+
+    生成的文件（以name为前缀）：
+        _cpu.txt      按累计耗时和自身耗时排序的cProfile报告
+        _cpu.prof     原始的cProfile数据，可用pstats或snakeviz查看
+        _memory.txt   每帧的耗时、分配峰值、残留内存以及分配最多的代码位置
+        _summary.json 上述数据的摘要
+
+    Args:
+        name: 场景名，用作文件名前缀
+        draw_frame: 绘制一帧的函数，参数为帧序号
+        frames: 帧数
+        out_dir: 报告目录
+        reset: 可选的无参数函数，在每一遍之前调用，清空场景自身的缓存，
+               使CPU与内存两遍都实际执行渲染
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = os.path.join(out_dir, name)
+
+    # CPU：cProfile与tracemalloc分两遍运行，互不影响计时
+    if reset is not None:
+        reset()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    for index in range(frames):
+        draw_frame(index)
+    profiler.disable()
+    cpu_seconds = time.perf_counter() - start
+
+    profiler.dump_stats(prefix + '_cpu.prof')
+    with open(prefix + '_cpu.txt', 'w', encoding='utf-8') as f:
+        for sort_key in ('cumulative', 'tottime'):
+            f.write(f"===== sorted by {sort_key} =====\n")
+            pstats.Stats(profiler, stream=f).sort_stats(sort_key).print_stats(TOP_FUNCTIONS)
+
+    # 内存：每帧的分配峰值与帧结束后仍残留的内存
+    per_frame = []
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for index in range(frames):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        frame_start = time.perf_counter()
+        draw_frame(index)
+        seconds = time.perf_counter() - frame_start
+        current, peak = tracemalloc.get_traced_memory()
+        per_frame.append({
+            'frame': index,
+            'seconds': seconds,
+            'peak_bytes': peak - baseline,
+            'retained_bytes': current - baseline,
+        })
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    top = after.compare_to(before, 'lineno')[:TOP_ALLOCATIONS]
+
+    with open(prefix + '_memory.txt', 'w', encoding='utf-8') as f:
+        f.write(f"{'frame':>6} {'ms':>9} {'peak KiB':>10} {'retained KiB':>13}\n")
+        for entry in per_frame:
+            f.write(f"{entry['frame']:>6} {entry['seconds'] * 1000:>9.3f} "
+                    f"{entry['peak_bytes'] / 1024:>10.1f} {entry['retained_bytes'] / 1024:>13.1f}\n")
+        f.write(f"\n===== top {TOP_ALLOCATIONS} allocation sites (net over all frames) =====\n")
+        for stat in top:
+            f.write(f"{stat}\n")
+
+    summary = {
+        'scene': name,
+        'frames': frames,
+        'cpu_seconds': cpu_seconds,
+        'mean_frame_ms': cpu_seconds / frames * 1000 if frames else 0.0,
+        'max_peak_bytes': max((entry['peak_bytes'] for entry in per_frame), default=0),
+        'total_retained_bytes': sum(entry['retained_bytes'] for entry in per_frame),
+        'per_frame': per_frame,
+    }
+    with open(prefix + '_summary.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def maybe_profile(name, draw_frame, argv=None, reset=None):
+    """
+    要求剖析时剖析draw_frame并返回True，调用方随后应直接退出；否则返回False
+
+    设置了ELLIPSE_PROFILE或带有--profile时只剖析绘制过程，不打开窗口，因此应在
+    main()创建窗口之前调用。
+
+    Args:
+        name: 场景名
+        draw_frame: 绘制一帧的函数，参数为帧序号
+        argv: 命令行参数，默认为sys.argv[1:]
+        reset: 每一遍剖析之前调用的函数，见profile_frames
+    """
+    options = profile_options(argv)
+    if options is None:
+        return False
+    out_dir, frames = options
+    summary = profile_frames(name, draw_frame, frames, out_dir, reset)
+    print(f"profiled {frames} frames of {name}: {summary['mean_frame_ms']:.2f} ms/frame, "
+          f"peak {summary['max_peak_bytes'] / 1024:.0f} KiB; reports in {out_dir}")
+    return True
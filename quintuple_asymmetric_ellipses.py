@@ -1,5 +1,8 @@
 import cv2
 import numpy as np
+from gradient_engine import create_boundary_blend_gradient
+from profiling import maybe_profile
+from render_loop import run_event_loop
 
 def create_asymmetric_ellipse_gradient(
     size,
@@ -8,75 +11,14 @@ def create_asymmetric_ellipse_gradient(
     brightnesses
 ):
     """创建五重不对称椭圆渐变"""
-    canvas = np.zeros(size, dtype=np.float32)
-    
-    # 创建坐标网格
-    y, x = np.mgrid[:size[0], :size[1]]  # 使用mgrid替代ogrid
-    
-    # 计算到五个椭圆中心的归一化距离
-    distances = []
-    for (cx, cy), (left_a, right_a, b) in zip(centers, axes_left_right):
-        # 分别计算左右两侧的距离
-        dx = x - cx
-        dy = y - cy
-        
-        # 创建距离数组
-        dist = np.zeros_like(x, dtype=np.float32)
-        
-        # 分别处理左右两侧
-        left_mask = dx <= 0
-        right_mask = dx > 0
-        
-        # 左半椭圆
-        dist[left_mask] = np.sqrt(
-            (dx[left_mask] / left_a) ** 2 + 
-            (dy[left_mask] / b) ** 2
-        )
-        
-        # 右半椭圆
-        dist[right_mask] = np.sqrt(
-            (dx[right_mask] / right_a) ** 2 + 
-            (dy[right_mask] / b) ** 2
-        )
-        
-        distances.append(dist)
-    
-    distances = np.array(distances)
-    
-    # 定义有效区域
-    valid_mask = (distances[0] <= 1) & (distances[-1] >= 1)
-    
-    if valid_mask.any():
-        gradient = np.zeros_like(canvas)
-        
-        # 计算到各个椭圆边界的距离
-        dists_to_boundary = []
-        for i, dist in enumerate(distances):
-            if i == 0:  # 最外椭圆
-                d = 1 - dist
-            else:  # 其他椭圆
-                d = np.abs(1 - dist)
-            dists_to_boundary.append(d)
-        
-        # 计算总距离
-        total_dist = sum(dists_to_boundary)
-        
-        # 在有效区域计算渐变
-        if valid_mask.any():
-            # 计算每个椭圆的权重
-            weights = []
-            for d in dists_to_boundary:
-                w = np.zeros_like(canvas)
-                w[valid_mask] = d[valid_mask] / total_dist[valid_mask]
-                weights.append(w)
-            
-            # 使用权重进行亮度插值
-            for w, b in zip(weights, brightnesses):
-                gradient += w * b
-        
-        canvas[valid_mask] = gradient[valid_mask]
-    
-    return canvas
+    # 按到各不对称椭圆边界的归一化距离混合亮度；逐环累加，峰值内存与环数无关
+    return create_boundary_blend_gradient(
+        size,
+        centers=centers,
+        axes=axes_left_right,
+        brightnesses=brightnesses,
+        streaming=True
+    )
 
 def draw_frame():
     # 创建黑色画布 (480, 640)
@@ -117,16 +59,13 @@ def draw_frame():
     return ring
 
 def main():
+    if maybe_profile('quintuple_asymmetric_ellipses', lambda index: draw_frame()):
+        return
+    
     window_name = 'Quintuple Asymmetric Ellipses'
     cv2.namedWindow(window_name)
     
-    while True:
-        frame = draw_frame()
-        cv2.imshow(window_name, frame)
-        
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+    run_event_loop(window_name, draw_frame)
     
     cv2.destroyAllWindows()
 
@@ -1,5 +1,8 @@
 import cv2
 import numpy as np
+from gradient_engine import create_boundary_blend_gradient
+from profiling import maybe_profile
+from render_loop import run_event_loop
 
 def create_quintuple_eccentric_ellipse_gradient(
     size,
@@ -8,53 +11,13 @@ def create_quintuple_eccentric_ellipse_gradient(
     brightnesses
 ):
     """创建五重偏心椭圆渐变"""
-    canvas = np.zeros(size, dtype=np.float32)
-    y, x = np.ogrid[:size[0], :size[1]]
-    
-    # 计算到五个椭圆中心的归一化距离
-    distances = []
-    for (cx, cy), (a, b) in zip(centers, axes):
-        dx = (x - cx) / a
-        dy = (y - cy) / b
-        dist = np.sqrt(dx*dx + dy*dy)
-        distances.append(dist)
-    
-    distances = np.array(distances)
-    
-    # 定义有效区域
-    valid_mask = (distances[0] <= 1) & (distances[-1] >= 1)
-    
-    if valid_mask.any():
-        gradient = np.zeros_like(canvas)
-        
-        # 计算到各个椭圆边界的距离
-        dists_to_boundary = []
-        for i, dist in enumerate(distances):
-            if i == 0:  # 最外椭圆
-                d = 1 - dist
-            else:  # 其他椭圆
-                d = np.abs(1 - dist)
-            dists_to_boundary.append(d)
-        
-        # 计算总距离
-        total_dist = sum(dists_to_boundary)
-        
-        # 在有效区域计算渐变
-        if valid_mask.any():
-            # 计算每个椭圆的权重
-            weights = []
-            for d in dists_to_boundary:
-                w = np.zeros_like(canvas)
-                w[valid_mask] = d[valid_mask] / total_dist[valid_mask]
-                weights.append(w)
-            
-            # 使用权重进行亮度插值
-            for w, b in zip(weights, brightnesses):
-                gradient += w * b
-        
-        canvas[valid_mask] = gradient[valid_mask]
-    
-    return canvas
+    # 按到各椭圆边界的归一化距离混合亮度
+    return create_boundary_blend_gradient(
+        size,
+        centers=centers,
+        axes=axes,
+        brightnesses=brightnesses
+    )
 
 def draw_frame():
     # 创建黑色画布 (480, 640)
@@ -95,16 +58,13 @@ def draw_frame():
     return ring
 
 def main():
+    if maybe_profile('quintuple_eccentric_ellipses', lambda index: draw_frame()):
+        return
+    
     window_name = 'Quintuple Eccentric Ellipses'
     cv2.namedWindow(window_name)
     
-    while True:
-        frame = draw_frame()
-        cv2.imshow(window_name, frame)
-        
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+    run_event_loop(window_name, draw_frame)
     
     cv2.destroyAllWindows()
 
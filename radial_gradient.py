@@ -0,0 +1,423 @@
+import numpy as np
+from frame_cache import FrameCache
+from gradient_engine import common_center, default_workspace, mirror_axis
+
+def contribution_reach(value):
+    """高斯贡献 value*exp(-2*d^2) 不小于1时归一化距离d的上限
+    
+    转换为uint8时小于1的贡献会被截断为0，超出该距离的像素无需计算。
+    value小于1时返回None，表示该椭圆对结果没有任何贡献。
+    """
+    if value < 1:
+        return None
+    return np.sqrt(np.log(value) / 2)
+
+def ellipse_bounding_box(params, width, height, reach=1.0):
+    """计算椭圆的解析包围盒并裁剪到画布内
+    
+    Args:
+        params: 椭圆参数，包含center、axes_left、axes_right、axes_y
+        width: 画布宽度
+        height: 画布高度
+        reach: 以归一化距离计的范围，1表示椭圆本身
+    
+    Returns:
+        (x0, y0, x1, y1)，右、下边界不包含在内；包围盒可能为空
+    """
+    center_x, center_y = params['center']
+    x0 = max(int(np.floor(center_x - params['axes_left'] * reach)), 0)
+    x1 = min(int(np.floor(center_x + params['axes_right'] * reach)) + 2, width)
+    y0 = max(int(np.floor(center_y - params['axes_y'] * reach)), 0)
+    y1 = min(int(np.floor(center_y + params['axes_y'] * reach)) + 2, height)
+    return x0, y0, x1, y1
+
+def intersect_boxes(a, b):
+    """求两个包围盒的交集，可能为空"""
+    return max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])
+
+def box_is_empty(box):
+    return box[0] >= box[2] or box[1] >= box[3]
+
+def ellipse_distance(params, x, y):
+    """计算坐标网格上各点到椭圆中心的归一化距离"""
+    center_x = params['center'][0]
+    center_y = params['center'][1]
+    
+    # 分别计算左右两边到中心的距离
+    x_dist = x - center_x
+    y_dist = y - center_y
+    
+    # 根据点在椭圆左右两侧选择不同的x轴半径
+    x_radius = np.where(x_dist < 0, 
+                       params['axes_left'], 
+                       params['axes_right'])
+    
+    # 计算归一化距离
+    x_norm = x_dist / x_radius
+    y_norm = y_dist / params['axes_y']
+    
+    # 计算到中心的归一化距离
+    return np.sqrt(x_norm * x_norm + y_norm * y_norm)
+
+def create_irregular_radial_gradient(width, height, ellipse_params, sprites=None,
+                                     dtype=np.float64, workspace=None, out=None, lut=None,
+                                     symmetry=True, separable=False):
+    """
+    创建不规则椭圆形径向渐变图像
+    
+    结果只在最外层椭圆内非零，因此只在最外层椭圆的包围盒内计算；
+    每个椭圆又只在其贡献不小于1的包围盒内计算，其余部分保持为0。
+    
+    传入SpriteCache且所有中心都是整数时，各椭圆的贡献从缓存的图块平移放置，
+    不再重新计算；此时dtype、lut和separable不起作用。
+    
+    Args:
+        width: 画布宽度
+        height: 画布高度
+        ellipse_params: 从内到外的椭圆参数列表，最后一个为最外层椭圆
+        sprites: 可选的SpriteCache
+        dtype: 计算精度；np.float32时在workspace的缓冲区中原地计算，
+               不再为每个椭圆分配临时数组。除最外层椭圆边界上个别因舍入
+               而进出mask的像素外，结果与float64相差至多1
+        workspace: float32模式使用的Workspace，默认为当前线程的Workspace
+        out: 可选的uint8输出数组，形状为 (height, width)
+        lut: 可选的GaussianProfile()查找表（radial_profiles.ProfileTable），给出时
+             按float32模式计算，exp由查表代替；贡献的误差不超过 value * lut.error
+        symmetry: 所有中心的y（或x，且左右半轴相等）相同且为整数时，只计算对称轴
+                  一侧，另一侧镜像复制，结果不变
+        separable: 按可分离方式计算：每个椭圆只对行、列各算一次一维高斯，二维上
+                   只做外积与取最大值，mask按每行的解析区间得到。与精确计算相比，
+                   乘积的舍入可能使个别像素相差1，恰好落在最外层椭圆边界上的像素
+                   可能进出mask
+    """
+    # 创建输出图像
+    if out is None:
+        gradient = np.zeros((height, width), dtype=np.uint8)
+    else:
+        gradient = out
+        gradient[...] = 0
+    if not ellipse_params:
+        return gradient
+    
+    if symmetry:
+        options = dict(sprites=sprites, dtype=dtype, workspace=workspace, lut=lut,
+                       separable=separable)
+        
+        def render_rows(start, stop):
+            create_irregular_radial_gradient(
+                width, stop - start, shift_params(ellipse_params, 0, start),
+                out=gradient[start:stop], **options
+            )
+        
+        def render_columns(start, stop):
+            create_irregular_radial_gradient(
+                stop - start, height, shift_params(ellipse_params, start, 0),
+                out=gradient[:, start:stop], **options
+            )
+        
+        center_x, center_y = symmetry_centers(ellipse_params)
+        if (mirror_axis(gradient, 0, center_y, render_rows)
+                or mirror_axis(gradient, 1, center_x, render_columns)):
+            return gradient
+    
+    # 最外层椭圆的包围盒即为需要计算的区域
+    outer_params = ellipse_params[-1]
+    outer_box = ellipse_bounding_box(outer_params, width, height)
+    if box_is_empty(outer_box):
+        return gradient
+    ox0, oy0, ox1, oy1 = outer_box
+    
+    if sprites is not None and centers_are_integral(ellipse_params):
+        height_field = compose_from_sprites(ellipse_params, outer_box, sprites)
+        gradient[oy0:oy1, ox0:ox1] = height_field.astype(np.uint8)
+        return gradient
+    
+    if separable:
+        if workspace is None:
+            workspace = default_workspace()
+        render_separable(width, height, ellipse_params, outer_box, gradient, workspace)
+        return gradient
+    
+    if np.dtype(dtype) == np.float32 or lut is not None:
+        if workspace is None:
+            workspace = default_workspace()
+        render_float32(width, height, ellipse_params, outer_box, gradient, workspace, lut)
+        return gradient
+    
+    # 包围盒内的高度场
+    height_field = np.zeros((oy1 - oy0, ox1 - ox0), dtype=float)
+    
+    # 从内到外处理每个椭圆
+    for params in ellipse_params:
+        reach = contribution_reach(params['value'])
+        if reach is None:
+            continue
+        box = intersect_boxes(
+            ellipse_bounding_box(params, width, height, reach), 
+            outer_box
+        )
+        if box_is_empty(box):
+            continue
+        x0, y0, x1, y1 = box
+        
+        # 创建包围盒内的坐标网格
+        y, x = np.ogrid[y0:y1, x0:x1]
+        dist = ellipse_distance(params, x, y)
+        
+        # 创建高斯形状的贡献
+        contribution = np.exp(-dist * dist * 2)
+        contribution = contribution * params['value']
+        
+        # 更新高度场
+        region = height_field[y0 - oy0:y1 - oy0, x0 - ox0:x1 - ox0]
+        np.maximum(region, contribution, out=region)
+    
+    # 创建最外层椭圆的mask并应用
+    y, x = np.ogrid[oy0:oy1, ox0:ox1]
+    outer_mask = (ellipse_distance(outer_params, x, y) <= 1).astype(np.uint8)
+    height_field = height_field * outer_mask
+    
+    gradient[oy0:oy1, ox0:ox1] = height_field.astype(np.uint8)
+    return gradient
+
+def ellipse_norm2_float32(params, box, workspace):
+    """
+    以float32在box内计算归一化距离的平方 x_norm^2 + y_norm^2
+    
+    结果写入workspace的缓冲区并返回，下次调用时会被覆盖。
+    """
+    x0, y0, x1, y1 = box
+    ramp = workspace.ramp(max(x1, y1))
+    center_x, center_y = params['center']
+    
+    # x方向：中心左右两侧使用不同的半径
+    x_norm = workspace.get('radial_x_norm', (x1 - x0,))
+    side = workspace.get('radial_side', (x1 - x0,), dtype=bool)
+    np.subtract(ramp[x0:x1], center_x, out=x_norm)
+    np.less(x_norm, 0, out=side)
+    np.divide(x_norm, params['axes_left'], out=x_norm, where=side)
+    np.logical_not(side, out=side)
+    np.divide(x_norm, params['axes_right'], out=x_norm, where=side)
+    np.multiply(x_norm, x_norm, out=x_norm)
+    
+    # y方向
+    y_norm = workspace.get('radial_y_norm', (y1 - y0,))
+    np.subtract(ramp[y0:y1], center_y, out=y_norm)
+    np.divide(y_norm, params['axes_y'], out=y_norm)
+    np.multiply(y_norm, y_norm, out=y_norm)
+    
+    norm2 = workspace.get('radial_norm2', (y1 - y0, x1 - x0))
+    np.add(y_norm[:, None], x_norm[None, :], out=norm2)
+    return norm2
+
+def render_float32(width, height, ellipse_params, outer_box, gradient, workspace, lut=None):
+    """单精度渲染：所有中间结果都写入workspace中复用的缓冲区；给出lut时用查表代替exp"""
+    ox0, oy0, ox1, oy1 = outer_box
+    height_field = workspace.get('radial_field', (oy1 - oy0, ox1 - ox0))
+    height_field[...] = 0
+    
+    for params in ellipse_params:
+        reach = contribution_reach(params['value'])
+        if reach is None:
+            continue
+        box = intersect_boxes(
+            ellipse_bounding_box(params, width, height, reach), 
+            outer_box
+        )
+        if box_is_empty(box):
+            continue
+        x0, y0, x1, y1 = box
+        
+        # value * exp(-2 * dist^2)，原地计算
+        contribution = ellipse_norm2_float32(params, box, workspace)
+        if lut is None:
+            np.multiply(contribution, -2, out=contribution)
+            np.exp(contribution, out=contribution)
+        else:
+            lut.lookup(contribution, out=contribution, workspace=workspace)
+        np.multiply(contribution, params['value'], out=contribution)
+        
+        region = height_field[y0 - oy0:y1 - oy0, x0 - ox0:x1 - ox0]
+        np.maximum(region, contribution, out=region)
+    
+    # 最外层椭圆内的值直接截断写入uint8输出
+    outer_mask = workspace.get('radial_mask', height_field.shape, dtype=bool)
+    np.less_equal(ellipse_norm2_float32(ellipse_params[-1], outer_box, workspace), 1, out=outer_mask)
+    np.copyto(gradient[oy0:oy1, ox0:ox1], height_field, casting='unsafe', where=outer_mask)
+
+def gaussian_factors(params, box):
+    """
+    椭圆贡献的两个一维因子：列方向 exp(-2*x_norm^2)，行方向 value*exp(-2*y_norm^2)
+    
+    二者的外积即为box内的贡献 value*exp(-2*(x_norm^2 + y_norm^2))。
+    """
+    x0, y0, x1, y1 = box
+    center_x, center_y = params['center']
+    x_dist = np.arange(x0, x1) - center_x
+    x_norm = x_dist / np.where(x_dist < 0, params['axes_left'], params['axes_right'])
+    y_norm = (np.arange(y0, y1) - center_y) / params['axes_y']
+    return np.exp(-2 * x_norm * x_norm), params['value'] * np.exp(-2 * y_norm * y_norm)
+
+def ellipse_row_spans(params, box):
+    """
+    椭圆内部 (dist <= 1) 在box每一行上的x区间 [low, high]
+    
+    椭圆外的行返回空区间（low > high）。
+    """
+    x0, y0, x1, y1 = box
+    center_x, center_y = params['center']
+    y_norm = (np.arange(y0, y1) - center_y) / params['axes_y']
+    remaining = 1 - y_norm * y_norm
+    half = np.sqrt(np.maximum(remaining, 0))
+    low = np.where(remaining >= 0, center_x - params['axes_left'] * half, np.inf)
+    high = np.where(remaining >= 0, center_x + params['axes_right'] * half, -np.inf)
+    return low, high
+
+def render_separable(width, height, ellipse_params, outer_box, gradient, workspace):
+    """可分离渲染：超越函数只在一维上计算，二维上只有外积、取最大值和区间比较"""
+    ox0, oy0, ox1, oy1 = outer_box
+    height_field = workspace.get('separable_field', (oy1 - oy0, ox1 - ox0), dtype=np.float64)
+    height_field[...] = 0
+    
+    for params in ellipse_params:
+        reach = contribution_reach(params['value'])
+        if reach is None:
+            continue
+        box = intersect_boxes(
+            ellipse_bounding_box(params, width, height, reach), 
+            outer_box
+        )
+        if box_is_empty(box):
+            continue
+        x0, y0, x1, y1 = box
+        
+        column_factor, row_factor = gaussian_factors(params, box)
+        contribution = workspace.get('separable_contribution', (y1 - y0, x1 - x0), dtype=np.float64)
+        np.multiply(row_factor[:, None], column_factor[None, :], out=contribution)
+        
+        region = height_field[y0 - oy0:y1 - oy0, x0 - ox0:x1 - ox0]
+        np.maximum(region, contribution, out=region)
+    
+    # 最外层椭圆的mask由每行的解析区间得到
+    low, high = ellipse_row_spans(ellipse_params[-1], outer_box)
+    columns = np.arange(ox0, ox1)
+    outer_mask = workspace.get('separable_mask', height_field.shape, dtype=bool)
+    inside = workspace.get('separable_inside', height_field.shape, dtype=bool)
+    np.greater_equal(columns[None, :], low[:, None], out=outer_mask)
+    np.less_equal(columns[None, :], high[:, None], out=inside)
+    np.logical_and(outer_mask, inside, out=outer_mask)
+    np.copyto(gradient[oy0:oy1, ox0:ox1], height_field, casting='unsafe', where=outer_mask)
+
+def symmetry_centers(ellipse_params):
+    """
+    返回所有椭圆共同的对称轴坐标 (center_x, center_y)，不存在时对应项为None
+    
+    中心y相同且为整数时上下对称；中心x相同且为整数、左右半轴相等时左右对称。
+    """
+    center_y = common_center([params['center'][1] for params in ellipse_params])
+    center_x = None
+    if all(params['axes_left'] == params['axes_right'] for params in ellipse_params):
+        center_x = common_center([params['center'][0] for params in ellipse_params])
+    return center_x, center_y
+
+def shift_params(ellipse_params, dx, dy):
+    """把所有椭圆中心平移 (-dx, -dy)，即换算到以 (dx, dy) 为原点的子画布上"""
+    return [
+        dict(params, center=(params['center'][0] - dx, params['center'][1] - dy))
+        for params in ellipse_params
+    ]
+
+def centers_are_integral(ellipse_params):
+    """所有椭圆中心是否都位于整数像素坐标上"""
+    return all(
+        float(params['center'][0]).is_integer() and float(params['center'][1]).is_integer()
+        for params in ellipse_params
+    )
+
+def sprite_extent(params, reach):
+    """以椭圆中心为原点的图块范围 (x0, y0, x1, y1)，与ellipse_bounding_box一致"""
+    return (
+        int(np.floor(-params['axes_left'] * reach)),
+        int(np.floor(-params['axes_y'] * reach)),
+        int(np.floor(params['axes_right'] * reach)) + 2,
+        int(np.floor(params['axes_y'] * reach)) + 2
+    )
+
+class SpriteCache:
+    """
+    单个椭圆的高斯贡献图块及其mask的缓存
+    
+    贡献图块以 (axes_left, axes_right, axes_y, value) 为键，mask以三个轴长为键；
+    图块以椭圆中心为原点在整数偏移上计算，平移到整数中心即与直接计算的结果完全一致。
+    """
+    
+    def __init__(self, maxsize=256):
+        self.cache = FrameCache(maxsize=maxsize)
+    
+    def contribution(self, params):
+        """返回 (图块, 范围)，贡献恒小于1时返回None"""
+        reach = contribution_reach(params['value'])
+        if reach is None:
+            return None
+        extent = sprite_extent(params, reach)
+        key = ('contribution', params['axes_left'], params['axes_right'], params['axes_y'], params['value'])
+        
+        def render():
+            y, x = np.ogrid[extent[1]:extent[3], extent[0]:extent[2]]
+            dist = ellipse_distance(_at_origin(params), x, y)
+            contribution = np.exp(-dist * dist * 2)
+            return contribution * params['value']
+        
+        return self.cache.get_or_render(key, render), extent
+    
+    def mask(self, params):
+        """返回椭圆内部 (dist <= 1) 的mask图块及其范围"""
+        extent = sprite_extent(params, 1.0)
+        key = ('mask', params['axes_left'], params['axes_right'], params['axes_y'])
+        
+        def render():
+            y, x = np.ogrid[extent[1]:extent[3], extent[0]:extent[2]]
+            return (ellipse_distance(_at_origin(params), x, y) <= 1).astype(np.uint8)
+        
+        return self.cache.get_or_render(key, render), extent
+    
+    def clear(self):
+        self.cache.clear()
+
+def _at_origin(params):
+    return dict(params, center=(0, 0))
+
+def _sprite_view(sprite, extent, center, box):
+    """把以center为中心的图块与包围盒box求交，返回 (box内的切片, 图块的切片)"""
+    center_x, center_y = int(center[0]), int(center[1])
+    placed = (center_x + extent[0], center_y + extent[1], center_x + extent[2], center_y + extent[3])
+    x0, y0, x1, y1 = intersect_boxes(placed, box)
+    if x0 >= x1 or y0 >= y1:
+        return None, None
+    target = (slice(y0 - box[1], y1 - box[1]), slice(x0 - box[0], x1 - box[0]))
+    source = (slice(y0 - placed[1], y1 - placed[1]), slice(x0 - placed[0], x1 - placed[0]))
+    return target, source
+
+def compose_from_sprites(ellipse_params, outer_box, sprites):
+    """用缓存的图块拼出最外层包围盒内的高度场，并应用最外层椭圆的mask"""
+    ox0, oy0, ox1, oy1 = outer_box
+    height_field = np.zeros((oy1 - oy0, ox1 - ox0), dtype=float)
+    
+    for params in ellipse_params:
+        entry = sprites.contribution(params)
+        if entry is None:
+            continue
+        sprite, extent = entry
+        target, source = _sprite_view(sprite, extent, params['center'], outer_box)
+        if target is None:
+            continue
+        region = height_field[target]
+        np.maximum(region, sprite[source], out=region)
+    
+    outer_params = ellipse_params[-1]
+    mask, extent = sprites.mask(outer_params)
+    outer_mask = np.zeros(height_field.shape, dtype=np.uint8)
+    target, source = _sprite_view(mask, extent, outer_params['center'], outer_box)
+    if target is not None:
+        outer_mask[target] = mask[source]
+    return height_field * outer_mask
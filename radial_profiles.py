@@ -0,0 +1,239 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from gradient_engine import default_workspace, ring_arrays
+
+# 查找表的默认误差上限（以剖面的输出单位计）与最大分辨率
+DEFAULT_MAX_ERROR = 0.25
+# 边界混合查找表的默认误差上限（归一化的边界距离）；sqrt在0附近斜率无界，
+# 最近点查找的误差约为 sqrt(step / 2)，更小的误差需要成倍增大的表
+DEFAULT_BOUNDARY_ERROR = 0.02
+MAX_RESOLUTION = 1 << 22
+
+# 自动确定分辨率时的起始分辨率，以及检查误差时每个区间内的采样点数
+INITIAL_RESOLUTION = 256
+ERROR_SAMPLES = 8
+
+
+@dataclass(frozen=True)
+class GaussianProfile:
+    """高斯剖面 value * exp(-2 * s)，与create_irregular_radial_gradient的贡献相同"""
+    value: float = 1.0
+
+    def __call__(self, s):
+        return self.value * np.exp(-2 * s)
+
+    def support(self):
+        return 0.0, None
+
+    def limit(self):
+        return 0.0
+
+    def default_s_max(self, max_error):
+        # 超出该范围后的值不超过误差上限的一半
+        return float(np.log(max(abs(self.value) * 2 / max_error, 1)) / 2)
+
+
+@dataclass(frozen=True)
+class LinearRingProfile:
+    """
+    线性圆环剖面，与gradient_rings的圆环渐变相同
+
+    s以外圆半径归一化；内圆处为brightness，外圆处为0，支撑区间为 [inner_ratio^2, 1]。
+    """
+    inner_ratio: float
+    brightness: float
+
+    def __call__(self, s):
+        return self.brightness * (1 - np.sqrt(s)) / (1 - self.inner_ratio)
+
+    def support(self):
+        return self.inner_ratio ** 2, 1.0
+
+    def limit(self):
+        return None
+
+    def default_s_max(self, max_error):
+        return 1.0
+
+
+@dataclass(frozen=True)
+class BoundaryBlendProfile:
+    """
+    到椭圆边界的归一化距离 |1 - sqrt(s)|，用于gradient_engine的边界混合
+
+    该剖面随s无限增大，查找表的s_max必须覆盖画布内可能出现的所有s。
+    """
+
+    def __call__(self, s):
+        return np.abs(1 - np.sqrt(s))
+
+    def support(self):
+        return 0.0, None
+
+    def limit(self):
+        return None
+
+    def default_s_max(self, max_error):
+        return 4.0
+
+
+class ProfileTable:
+    """
+    以归一化距离平方s为索引的量化查找表
+
+    把 [0, s_max] 均匀分为resolution个区间，每个区间取中点的值，查找时取s所在
+    区间的值，超出s_max时取最后一个区间。未指定resolution时从INITIAL_RESOLUTION
+    开始加倍，直到剖面支撑区间内的最大误差不超过max_error。
+    """
+
+    def __init__(self, profile, s_max=None, resolution=None, max_error=DEFAULT_MAX_ERROR):
+        self.profile = profile
+        self.s_max = float(profile.default_s_max(max_error) if s_max is None else s_max)
+
+        if resolution is not None:
+            self._build(resolution)
+            return
+
+        resolution = INITIAL_RESOLUTION
+        while True:
+            self._build(resolution)
+            if self.error <= max_error:
+                break
+            if resolution >= MAX_RESOLUTION:
+                raise ValueError(
+                    f"cannot reach max_error={max_error} with {MAX_RESOLUTION} entries "
+                    f"(error {self.error:.3g})"
+                )
+            resolution *= 2
+
+    def _build(self, resolution):
+        self.resolution = resolution
+        self.step = self.s_max / resolution
+        self.inv_step = resolution / self.s_max
+        # 第i项取第i个区间中点的值，查找时把 s / step 截断取整即得到最近的采样点
+        samples = (np.arange(resolution) + 0.5) * self.step
+        self.table = self.profile(samples).astype(np.float32)
+        self.error = self._measure_error()
+
+    def _measure_error(self):
+        """在支撑区间内密集采样，测量查找结果与精确值的最大误差"""
+        low, high = self.profile.support()
+        high = self.s_max if high is None else min(high, self.s_max)
+        count = min(self.resolution * ERROR_SAMPLES, MAX_RESOLUTION * 2) + 1
+        s = np.linspace(low, high, count)
+        exact = self.profile(s)
+        error = float(np.max(np.abs(self.lookup(s.astype(np.float32)) - exact)))
+        # 支撑区间无上界且剖面趋于定值时，计入超出s_max后取最后一个点的截断误差
+        limit = self.profile.limit()
+        if self.profile.support()[1] is None and limit is not None:
+            error = max(error, float(abs(self.table[-1] - limit)))
+        return error
+
+    def lookup(self, s, out=None, workspace=None):
+        """
+        查找s对应的剖面值
+
+        Args:
+            s: 归一化距离的平方（float32数组）
+            out: 可选的float32输出数组，可以就是s本身
+            workspace: 存放索引的Workspace，默认为当前线程的Workspace
+        """
+        if workspace is None:
+            workspace = default_workspace()
+        # 乘法结果直接截断写入整数索引，超出表长的索引由take裁剪到最后一项
+        index = workspace.get('lut_index', s.shape, dtype=np.intp)
+        np.multiply(s, self.inv_step, out=index, casting='unsafe')
+        if out is None:
+            out = np.empty(s.shape, dtype=np.float32)
+        return np.take(self.table, index, out=out, mode='clip')
+
+
+@lru_cache(maxsize=32)
+def profile_table(profile, s_max=None, resolution=None, max_error=DEFAULT_MAX_ERROR):
+    """返回缓存的ProfileTable，相同参数只构建一次"""
+    return ProfileTable(profile, s_max, resolution, max_error)
+
+
+def boundary_table(size, centers, axes, max_error=DEFAULT_BOUNDARY_ERROR):
+    """
+    为create_boundary_blend_gradient构建覆盖有效区域的BoundaryBlendProfile查找表
+
+    有效区域在最外层（第0个）椭圆之内，s_max取各环在该椭圆包围盒（与画布的交集）
+    四角处的归一化距离平方的最大值，并向上取到2的幂以便缓存复用。内层椭圆很小时
+    s_max很大，sqrt在0附近的误差要求的分辨率可能超过MAX_RESOLUTION，此时返回None，
+    create_boundary_blend_gradient随即按精确路径计算。
+
+    Args:
+        size: (height, width) 画布尺寸
+        centers: N个(x, y)中心
+        axes: N个轴参数，格式同create_boundary_blend_gradient
+        max_error: 边界距离（归一化单位）的误差上限
+    """
+    height, width = size
+    cx, cy, left, right, axis_y, _, _ = ring_arrays(centers, axes, np.zeros(len(centers)))
+    x0 = max(float(cx[0] - left[0]), 0.0)
+    x1 = min(float(cx[0] + right[0]), width - 1.0)
+    y0 = max(float(cy[0] - axis_y[0]), 0.0)
+    y1 = min(float(cy[0] + axis_y[0]), height - 1.0)
+    x_far = np.maximum(np.maximum(cx - x0, 0) / left, np.maximum(x1 - cx, 0) / right)
+    y_far = np.maximum(np.abs(y0 - cy), np.abs(y1 - cy)) / axis_y
+    s_max = float(np.max(x_far * x_far + y_far * y_far))
+    s_max = 2.0 ** int(np.ceil(np.log2(max(s_max, 1.0))))
+
+    # 最近点查找在s=0附近的误差约为 sqrt(step / 2)，据此预先判断能否达到误差上限
+    if s_max / (2 * max_error * max_error) > MAX_RESOLUTION:
+        return None
+    try:
+        return profile_table(BoundaryBlendProfile(), s_max, max_error=max_error)
+    except ValueError:
+        return None
+
+
+def render_profile(size, center, axes, table, out=None, workspace=None):
+    """
+    用查找表渲染单个椭圆的径向剖面，支撑区间以外为0
+
+    Args:
+        size: (height, width) 画布尺寸
+        center: (x, y) 中心
+        axes: (a, b) 归一化所用的x、y方向半轴
+        table: ProfileTable
+        out: 可选的float32输出数组
+        workspace: 复用临时缓冲区的Workspace，默认为当前线程的Workspace
+    """
+    height, width = size
+    if workspace is None:
+        workspace = default_workspace()
+    if out is None:
+        out = np.zeros((height, width), dtype=np.float32)
+    else:
+        out[...] = 0
+
+    ramp = workspace.ramp(max(width, height))
+    x_norm = workspace.get('profile_x_norm', (width,))
+    np.subtract(ramp[:width], center[0], out=x_norm)
+    np.divide(x_norm, axes[0], out=x_norm)
+    np.multiply(x_norm, x_norm, out=x_norm)
+    y_norm = workspace.get('profile_y_norm', (height,))
+    np.subtract(ramp[:height], center[1], out=y_norm)
+    np.divide(y_norm, axes[1], out=y_norm)
+    np.multiply(y_norm, y_norm, out=y_norm)
+
+    s = workspace.get('profile_s', (height, width))
+    np.add(y_norm[:, None], x_norm[None, :], out=s)
+
+    # 支撑区间由s直接比较得到，不需要开方
+    low, high = table.profile.support()
+    inside = workspace.get('profile_inside', (height, width), dtype=bool)
+    np.greater_equal(s, low, out=inside)
+    if high is not None:
+        within = workspace.get('profile_within', (height, width), dtype=bool)
+        np.less_equal(s, high, out=within)
+        np.logical_and(inside, within, out=inside)
+
+    values = table.lookup(s, out=workspace.get('profile_values', (height, width)), workspace=workspace)
+    np.copyto(out, values, where=inside)
+    return out
@@ -0,0 +1,59 @@
+import cv2
+
+from instrumentation import Instrumentation
+
+# 画面没有变化时每次等待窗口事件的时长(ms)
+IDLE_WAIT_MS = 50
+
+# 表示"还没有渲染过"的状态
+_NOT_RENDERED = object()
+
+
+def run_event_loop(window_name, render, get_state=None, handle_key=None, tick=None, wait_ms=None,
+                   instrumentation=None):
+    """
+    事件驱动的显示循环
+
+    只有状态变化时才重新渲染并显示画面，否则只处理窗口事件，静止的画面几乎不占用CPU。
+    按q退出。
+
+    Args:
+        window_name: 窗口名
+        render: 无参数的函数，返回要显示的帧
+        get_state: 返回可比较的状态（如参数元组），与上次显示时不同则重新渲染；
+                   为None时画面只渲染一次，之后只处理窗口事件，适用于参数不变的静态场景
+        handle_key: 处理按键的函数，参数为cv2.waitKey的返回值；返回False时退出循环
+        tick: 每轮循环开始时调用，用于推进动画等随时间变化的状态
+        wait_ms: 每轮等待窗口事件的时长(ms)，可以是整数或返回整数的函数，默认为IDLE_WAIT_MS
+        instrumentation: 可选的Instrumentation，记录'frame'、'imshow'、'waitKey'各阶段的耗时
+    """
+    if instrumentation is None:
+        instrumentation = Instrumentation(enabled=False)
+    shown_state = _NOT_RENDERED
+
+    while True:
+        if tick is not None:
+            tick()
+
+        state = get_state() if get_state is not None else None
+        if shown_state is _NOT_RENDERED or state != shown_state:
+            with instrumentation.stage('frame'):
+                frame = render()
+            with instrumentation.stage('imshow'):
+                cv2.imshow(window_name, frame)
+            instrumentation.frame()
+            shown_state = state
+
+        if wait_ms is None:
+            delay = IDLE_WAIT_MS
+        elif callable(wait_ms):
+            delay = wait_ms()
+        else:
+            delay = wait_ms
+
+        with instrumentation.stage('waitKey'):
+            key = cv2.waitKey(delay)
+        if key != -1 and key & 0xFF == ord('q'):
+            break
+        if handle_key is not None and handle_key(key) is False:
+            break
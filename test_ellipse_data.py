@@ -0,0 +1,105 @@
+"""
+椭圆组与时间线的测试
+
+ellipse_sets与原来逐组插值生成的31个EllipseSet逐一比较；自然三次样条检查
+经过关键帧和两端二阶导数为0；Timeline检查pickle与复制。
+
+运行：
+    python -m pytest -q
+"""
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from ellipse_data import Timeline, center_set, ellipse_set_at, ellipse_sets, left_set, right_set
+
+
+def reference_ellipse_sets(left, center, right):
+    """原来的init_ellipse_sets：每半边在两端之间用np.interp取15个点，结果用int()取整"""
+    def half(start, stop):
+        sets = []
+        for i in range(15):
+            centers, axes = [], []
+            for j in range(1, 6):
+                start_center, stop_center = getattr(start, f'center{j}'), getattr(stop, f'center{j}')
+                start_axes, stop_axes = getattr(start, f'axes{j}'), getattr(stop, f'axes{j}')
+                centers.append(tuple(int(np.interp(i, [0, 14], [start_center[k], stop_center[k]]))
+                                     for k in range(2)))
+                axes.append(tuple(int(np.interp(i, [0, 14], [start_axes[k], stop_axes[k]]))
+                                  for k in range(2)) + (j,))
+            sets.append((centers, axes))
+        return sets
+
+    as_fields = (lambda s: ([getattr(s, f'center{j}') for j in range(1, 6)],
+                            [getattr(s, f'axes{j}') for j in range(1, 6)]))
+    return half(left, center) + [as_fields(center)] + half(center, right)
+
+
+def test_ellipse_sets_match_original_interpolation():
+    expected = reference_ellipse_sets(left_set, center_set, right_set)
+    assert len(ellipse_sets) == len(expected) == 31
+    for i, (centers, axes) in enumerate(expected):
+        ellipse_set = ellipse_sets[i]
+        assert [ellipse_set.center1, ellipse_set.center2, ellipse_set.center3,
+                ellipse_set.center4, ellipse_set.center5] == centers, i
+        assert [ellipse_set.axes1, ellipse_set.axes2, ellipse_set.axes3,
+                ellipse_set.axes4, ellipse_set.axes5] == axes, i
+
+
+def test_position_timeline_matches_sets_at_integer_positions():
+    # 连续位置的时间线与ellipse_sets只差取整
+    for i in range(len(ellipse_sets)):
+        np.testing.assert_array_equal(np.trunc(ellipse_set_at(float(i - 15)).data), ellipse_sets[i].data)
+
+
+def random_timeline(seed, **options):
+    rng = np.random.default_rng(seed)
+    key_positions = np.cumsum(rng.uniform(1, 6, 6)) - 10
+    keyframes = rng.uniform(-50, 150, (6, 5, 5))
+    return Timeline(keyframes, key_positions, interpolation='cubic', **options), keyframes, key_positions
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_natural_spline_passes_through_keyframes(seed):
+    timeline, keyframes, key_positions = random_timeline(seed)
+    np.testing.assert_allclose(timeline.evaluate(key_positions), keyframes, rtol=1e-12, atol=1e-9)
+    for position, keyframe in zip(key_positions, keyframes):
+        np.testing.assert_allclose(timeline.at(float(position)).data, keyframe, rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_natural_spline_has_zero_curvature_at_ends(seed):
+    timeline, _, key_positions = random_timeline(seed)
+    h = 1e-3
+
+    def second_derivative(x):
+        # 三次多项式的中心二阶差分是精确的
+        values = timeline.evaluate([x - h, x, x + h])
+        return (values[0] - 2 * values[1] + values[2]) / (h * h)
+
+    interior = np.abs(second_derivative(key_positions[2])).max()
+    assert interior > 1  # 中间的二阶导数不为0，测试才有意义
+    for end, inside in ((key_positions[0], key_positions[0] + h), (key_positions[-1], key_positions[-1] - h)):
+        # 端点处的二阶导数沿段线性变化，离端点h处应接近0
+        assert np.abs(second_derivative(inside)).max() < 1e-2 * interior, end
+
+
+def pickle_round_trip(obj):
+    return pickle.loads(pickle.dumps(obj))
+
+
+@pytest.mark.parametrize('clone', [pickle_round_trip, copy.copy, copy.deepcopy])
+def test_timeline_survives_pickle_and_copy(clone):
+    timeline, _, key_positions = random_timeline(3, step=0.5, cache_size=8)
+    timeline.at(1.25)
+    restored = clone(timeline)
+    assert restored.at is not timeline.at
+    assert restored.at.cache_info().maxsize == 8
+    assert len(restored) == len(timeline)
+    for position in (key_positions[0], 1.25, 3.0):
+        np.testing.assert_array_equal(restored.at(position).data, timeline.at(position).data)
+    np.testing.assert_array_equal(restored[3].data, timeline[3].data)
+
+    np.testing.assert_array_equal(clone(ellipse_sets).data, ellipse_sets.data)
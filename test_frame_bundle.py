@@ -0,0 +1,79 @@
+"""
+帧包的测试
+
+用较少的小数位置（substeps=2）生成帧包，检查读回的画面与直接渲染一致、
+参数变化后识别为过期，以及文件损坏时回退到实时渲染。
+
+运行：
+    python -m pytest -q
+"""
+import os
+
+import numpy as np
+import pytest
+
+import ellipse_animation as animation
+from frame_bundle import FrameBundle, write_bundle
+
+SUBSTEPS = 2
+
+
+@pytest.fixture(scope='module')
+def bundle_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('bundle') / 'test.bundle')
+    animation.build_frame_bundle(path, SUBSTEPS)
+    return path
+
+
+def test_bundle_round_trip(bundle_path):
+    bundle = FrameBundle(bundle_path)
+    keys = animation.bundle_keys(SUBSTEPS)
+    assert bundle.keys == keys
+    assert len(bundle) == len(animation.ellipse_sets) + (animation.MOVE_MAX - animation.MOVE_MIN) * SUBSTEPS + 1
+    assert bundle.frame_shape == (animation.canvas_height, animation.canvas_width)
+    assert bundle.metadata == {'substeps': SUBSTEPS}
+    assert not bundle.is_stale(animation.bundle_hash(keys))
+    for key in (0, 15, 30, ('position', -14.5), ('position', 0.0), ('position', 7.5)):
+        expected = animation.render_ellipse_params(animation.bundle_params(key))
+        np.testing.assert_array_equal(bundle.get(key), expected)
+    assert bundle.get(('position', 0.25)) is None
+    assert not bundle.frames.flags.writeable
+
+
+def test_playback_uses_bundle_frames(bundle_path, monkeypatch):
+    bundle = animation.load_frame_bundle(bundle_path)
+    assert bundle is not None
+    monkeypatch.setattr(animation, 'playback_bundle', bundle)
+    animation.frame_cache.clear()
+    frame = animation.render_gradient_at(-3.5, animation.PROGRESSIVE_LEVELS[0])
+    assert frame.shape == bundle.frame_shape
+    assert np.shares_memory(frame, bundle.frames)
+    assert len(animation.frame_cache) == 0
+
+
+def test_stale_bundle_is_not_used(bundle_path, monkeypatch, capsys):
+    monkeypatch.setattr(animation, 'ELLIPSE_VALUES', tuple(v + 1 for v in animation.ELLIPSE_VALUES))
+    assert FrameBundle(bundle_path).is_stale(animation.bundle_hash(animation.bundle_keys(SUBSTEPS)))
+    assert animation.load_frame_bundle(bundle_path) is None
+    assert f"python frame_bundle.py {bundle_path} --substeps {SUBSTEPS}" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('damage', ['junk', 'truncated', 'missing'])
+def test_bad_bundle_falls_back_to_rendering(bundle_path, tmp_path, capsys, damage):
+    path = str(tmp_path / 'bad.bundle')
+    if damage == 'junk':
+        with open(path, 'wb') as f:
+            f.write(b'not a frame bundle at all')
+    elif damage == 'truncated':
+        with open(bundle_path, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read(os.path.getsize(bundle_path) // 2))
+    assert animation.load_frame_bundle(path) is None
+    assert f"cannot use frame bundle {path}" in capsys.readouterr().out
+
+
+def test_write_bundle_rejects_wrong_frame_count(tmp_path):
+    path = str(tmp_path / 'short.bundle')
+    frames = (np.zeros((4, 6), np.uint8) for _ in range(2))
+    with pytest.raises(ValueError):
+        write_bundle(path, frames, [0, 1, 2], (4, 6), 'hash')
+    assert not os.path.exists(path) and not os.path.exists(path + '.tmp')
@@ -0,0 +1,20 @@
+"""
+融合计算模式的测试：NumPy分块实现与（安装时的）numexpr实现都与默认模式相差在舍入误差内
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from gradient_engine import create_boundary_blend_gradient
+from test_render_equivalence import random_rings
+
+
+@pytest.mark.parametrize('fused', ['numpy', True])
+@pytest.mark.parametrize('seed', range(10))
+def test_fused_matches_default(fused, seed):
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(seed))
+    expected = create_boundary_blend_gradient(size, centers, axes, brightnesses)
+    result = create_boundary_blend_gradient(size, centers, axes, brightnesses, fused=fused)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-3)
@@ -0,0 +1,49 @@
+"""
+增量更新画面的测试：只重绘变化区域的画面与每帧整幅合成的画面逐像素相同
+
+运行：
+    python -m pytest -q
+"""
+import cv2
+import numpy as np
+
+import ellipse_animation as animation
+from ellipse_data import ellipse_set_at, ellipse_sets
+
+
+def full_frame(move_count, position, scale):
+    """不经过增量更新，整幅合成一帧：放大渐变、转换为BGR、合成全新的HUD"""
+    if position is None:
+        key, ellipse_set = move_count + 15, ellipse_sets[move_count + 15]
+        text = f"Current Index: {move_count} (Array Index: {move_count + 15})"
+    else:
+        key, ellipse_set = ('position', position), ellipse_set_at(position)
+        text = f"Current Index: {move_count} (Position: {position:.3f})"
+    gray = animation.render_cached(key, animation.build_ellipse_params(ellipse_set), scale)
+    if gray.shape != (animation.canvas_height, animation.canvas_width):
+        gray = cv2.resize(gray, (animation.canvas_width, animation.canvas_height),
+                          interpolation=cv2.INTER_LINEAR)
+    frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+    hud = animation.build_hud()
+    hud.set_text('index', text)
+    hud.set_text('mode', "Auto Move: ON" if animation.auto_move else "Auto Move: OFF")
+    hud.composite(frame)
+    return frame
+
+
+def test_incremental_frames_match_full_redraw(monkeypatch):
+    # 外层椭圆足够亮，且移出绘图区域边框（HUD区域每帧都会重绘），
+    # 漏掉重绘的渐变区域会留下残影
+    monkeypatch.setattr(animation, 'ELLIPSE_VALUES', (200, 180, 160, 140, 120))
+    monkeypatch.setattr(animation, 'BASE_CENTER_Y', 480)
+    monkeypatch.setattr(animation, 'auto_move', False)
+    animation.reset_render_state()
+    rng = np.random.default_rng(5)
+    for _ in range(60):
+        move_count = int(rng.integers(-15, 16))
+        position = None if rng.random() < 0.4 else float(np.round(rng.uniform(-15, 15) * 8) / 8)
+        scale = int(rng.choice([1, 2, 4]))
+        monkeypatch.setattr(animation, 'auto_move', bool(rng.random() < 0.5))
+        expected = full_frame(move_count, position, scale)
+        np.testing.assert_array_equal(animation.draw_frame(move_count, position, scale), expected)
+    animation.reset_render_state()
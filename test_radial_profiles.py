@@ -0,0 +1,104 @@
+"""
+径向剖面查找表的测试：查表结果与精确计算的差不超过各处说明的误差上限
+
+create_irregular_radial_gradient的lut=、create_boundary_blend_gradient的boundary_table=
+与create_ring_gradient的lut_error=分别与精确路径比较。
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import ellipse_animation as animation
+from gradient_engine import create_boundary_blend_gradient
+from gradient_rings import create_ring_gradient
+from radial_gradient import create_irregular_radial_gradient
+from radial_profiles import BoundaryBlendProfile, GaussianProfile, ProfileTable, boundary_table, profile_table
+from test_render_equivalence import random_ellipse_params, random_rings, reference_distances, reference_radial
+
+# 最外层椭圆边界上因float32舍入而进出mask的像素数上限
+BOUNDARY_PIXELS = 4
+
+
+def assert_within(result, expected, tolerance):
+    difference = np.abs(np.asarray(result, dtype=float) - expected)
+    assert np.count_nonzero(difference > tolerance) <= BOUNDARY_PIXELS, difference.max()
+
+
+@pytest.mark.parametrize('profile', [GaussianProfile(), GaussianProfile(180.0), BoundaryBlendProfile()])
+@pytest.mark.parametrize('max_error', [0.25, 0.02])
+def test_table_error_is_measured_and_bounded(profile, max_error):
+    table = ProfileTable(profile, max_error=max_error)
+    assert table.error <= max_error
+    low, high = profile.support()
+    s = np.linspace(low, table.s_max if high is None else high, 100001)
+    error = np.abs(table.lookup(s.astype(np.float32)) - profile(s))
+    # 独立的更密采样也不超过误差上限（float32的s另有少量舍入）
+    assert error.max() <= max_error * 1.01 + 1e-6
+
+
+@pytest.mark.parametrize('max_error', [0.25, 0.01, 0.002])
+@pytest.mark.parametrize('seed', range(3))
+def test_radial_lut_within_value_times_error(max_error, seed):
+    params = random_ellipse_params(np.random.default_rng(seed))
+    width, height = animation.canvas_width, animation.canvas_height
+    lut = profile_table(GaussianProfile(), max_error=max_error)
+    result = create_irregular_radial_gradient(width, height, params, lut=lut)
+    # 每个贡献的误差不超过 value * lut.error，取最大值后仍然成立；截断为uint8再加1
+    tolerance = np.floor(max(p['value'] for p in params) * lut.error) + 1
+    assert_within(result, reference_radial(width, height, params), tolerance)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_boundary_table_within_distance_error(seed):
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(seed))
+    scales = np.random.default_rng(seed + 100).uniform(0.5, 2, len(centers))
+    table = boundary_table(size, centers, axes)
+    if table is None:
+        pytest.skip("error bound unreachable for these rings; the engine uses the exact path")
+    assert table.error <= 0.02
+
+    rho, distance = reference_distances(size, centers, axes, scales)
+    valid = (rho[0] <= 1) & (rho[-1] >= 1)
+    # 查找表覆盖有效区域内出现的所有s
+    assert (rho[:, valid] ** 2).max() <= table.s_max
+
+    # 每个距离的误差不超过 error * scale_i，混合结果的误差随之受限：
+    # |sum(b_i d_i) / sum(d_i) - 精确值| <= (max b - min b) * slack / (sum(d_i) - slack)
+    slack = table.error * scales.sum()
+    total = distance.sum(axis=0)
+    weighted = np.einsum('n,nhw->hw', brightnesses, distance)
+    checked = valid & (total > 2 * slack)
+    expected = weighted[checked] / total[checked]
+    bound = np.ptp(brightnesses) * slack / (total[checked] - slack) + 1e-3
+
+    result = create_boundary_blend_gradient(size, centers, axes, brightnesses, scales, boundary_table=table)
+    assert checked.sum() > 0
+    assert np.all(np.abs(result[checked] - expected) <= bound)
+    # 有效区域之外与精确路径一样为0
+    assert not result[~valid].any()
+
+
+def test_boundary_table_falls_back_when_unreachable():
+    # 内层椭圆极小时s_max很大，误差上限无法达到，返回None即按精确路径计算
+    size = (200, 200)
+    centers = [(100, 100), (100, 100)]
+    axes = [(80, 80, 80), (0.01, 0.01, 0.01)]
+    assert boundary_table(size, centers, axes) is None
+    np.testing.assert_array_equal(
+        create_boundary_blend_gradient(size, centers, axes, [200, 0],
+                                       boundary_table=boundary_table(size, centers, axes)),
+        create_boundary_blend_gradient(size, centers, axes, [200, 0])
+    )
+
+
+@pytest.mark.parametrize('lut_error', [0.05, 0.01, 0.001])
+@pytest.mark.parametrize('radii', [(120, 150), (30, 200), (5, 40)])
+def test_ring_lut_within_lut_error(lut_error, radii):
+    inner, outer = radii
+    size, center, brightness = (480, 640), (320.5, 240.25), 0.3
+    expected = create_ring_gradient(size, center, inner, outer, brightness)
+    result = create_ring_gradient(size, center, inner, outer, brightness, lut_error=lut_error)
+    # 精确路径为float32计算，另加float32的舍入
+    assert_within(result, expected, lut_error + 1e-5)
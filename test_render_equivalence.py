@@ -0,0 +1,118 @@
+"""
+渲染路径的等价性测试：参考实现与共用的边界混合引擎
+
+共用的边界混合引擎、不对称椭圆核以及径向渐变的默认路径与直接按定义计算的
+参考实现比较。参考实现和随机参数也供其他渲染模式的测试（对称、单精度、
+可分离、逐环累加、融合计算、图块、分块渲染、增量更新）使用。
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import ellipse_animation as animation
+from ellipse_data import ellipse_set_at, ellipse_sets
+from gradient_engine import create_boundary_blend_gradient
+from quintuple_asymmetric_ellipses import create_asymmetric_ellipse_gradient
+from radial_gradient import create_irregular_radial_gradient
+
+
+def reference_radial(width, height, ellipse_params):
+    """原始的高斯取最大值核：整幅计算每个椭圆的贡献，最后乘以最外层椭圆的mask"""
+    y, x = np.ogrid[:height, :width]
+    height_field = np.zeros((height, width))
+    for params in ellipse_params:
+        x_dist = x - params['center'][0]
+        y_dist = y - params['center'][1]
+        x_radius = np.where(x_dist < 0, params['axes_left'], params['axes_right'])
+        x_norm = x_dist / x_radius
+        y_norm = y_dist / params['axes_y']
+        dist = np.sqrt(x_norm * x_norm + y_norm * y_norm)
+        height_field = np.maximum(height_field, np.exp(-dist * dist * 2) * params['value'])
+    height_field = height_field * (dist <= 1)
+    return height_field.astype(np.uint8)
+
+
+def reference_distances(size, centers, axes, scales=None):
+    """各环的归一化距离rho (N, H, W) 与到边界的距离 |1 - rho| * scale"""
+    height, width = size
+    y, x = np.mgrid[:height, :width].astype(float)
+    if scales is None:
+        scales = np.ones(len(centers))
+    rho = []
+    for (cx, cy), (left, right, axis_y) in zip(centers, axes):
+        dx = x - cx
+        x_norm = dx / np.where(dx <= 0, left, right)
+        y_norm = (y - cy) / axis_y
+        rho.append(np.sqrt(x_norm * x_norm + y_norm * y_norm))
+    rho = np.array(rho)
+    return rho, np.abs(1 - rho) * np.asarray(scales, dtype=float)[:, None, None]
+
+
+def reference_blend(size, centers, axes, brightnesses, scales=None):
+    """边界混合的定义：有效区域内为 sum(b_i * d_i) / sum(d_i)，d_i = |1 - rho_i| * scale_i"""
+    rho, distance = reference_distances(size, centers, axes, scales)
+    total = distance.sum(axis=0)
+    weighted = np.einsum('n,nhw->hw', np.asarray(brightnesses, dtype=float), distance)
+    valid = (rho[0] <= 1) & (rho[-1] >= 1) & (total > 0)
+    out = np.zeros(size)
+    out[valid] = weighted[valid] / total[valid]
+    return out
+
+
+def random_rings(rng, symmetric=False):
+    """随机的画布尺寸与从外到内的环参数"""
+    height, width = (int(v) for v in rng.integers(60, 240, 2))
+    count = int(rng.integers(2, 7))
+    outer = rng.uniform(20, min(width, height) / 2)
+    radii = np.sort(rng.uniform(3, outer, count))[::-1]
+    if symmetric:
+        centers = np.tile([width // 2 + int(rng.integers(-5, 6)), height // 2], (count, 1)).astype(float)
+        centers[:, 0] = centers[0, 0]
+    else:
+        centers = np.stack([width / 2 + rng.uniform(-8, 8, count),
+                            height / 2 + rng.uniform(-8, 8, count)], axis=1)
+    left = radii * rng.uniform(0.8, 1.2, count)
+    right = left if symmetric else radii * rng.uniform(0.8, 1.2, count)
+    axes = np.stack([left, right, radii * rng.uniform(0.4, 1.0, count)], axis=1)
+    brightnesses = rng.uniform(0, 255, count)
+    return (height, width), centers, axes, brightnesses
+
+
+def random_ellipse_params(rng):
+    """随机的连续位置对应的椭圆参数（中心一般不是整数）"""
+    return animation.build_ellipse_params(ellipse_set_at(float(rng.uniform(-15, 15))))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_boundary_blend_matches_reference(seed):
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(seed))
+    scales = np.random.default_rng(seed + 100).uniform(0.5, 2, len(centers))
+    expected = reference_blend(size, centers, axes, brightnesses, scales)
+    result = create_boundary_blend_gradient(size, centers, axes, brightnesses, scales)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-3)
+
+
+def test_asymmetric_kernel_matches_reference():
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(7))
+    result = create_asymmetric_ellipse_gradient(size, centers, axes, brightnesses)
+    np.testing.assert_allclose(result, reference_blend(size, centers, axes, brightnesses),
+                               rtol=1e-5, atol=1e-3)
+
+
+@pytest.mark.parametrize('index', [0, 7, 15, 22, 30])
+def test_radial_gradient_matches_reference(index):
+    params = animation.build_ellipse_params(ellipse_sets[index])
+    width, height = animation.canvas_width, animation.canvas_height
+    np.testing.assert_array_equal(create_irregular_radial_gradient(width, height, params),
+                                  reference_radial(width, height, params))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_radial_gradient_fractional_positions(seed):
+    params = random_ellipse_params(np.random.default_rng(seed))
+    width, height = animation.canvas_width, animation.canvas_height
+    np.testing.assert_array_equal(create_irregular_radial_gradient(width, height, params),
+                                  reference_radial(width, height, params))
@@ -0,0 +1,21 @@
+"""
+可分离计算的测试：行、列各算一次一维高斯再做外积，与精确计算只在个别像素上相差1
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import ellipse_animation as animation
+from radial_gradient import create_irregular_radial_gradient
+from test_render_equivalence import random_ellipse_params, reference_radial
+from test_single_precision import assert_close_to_reference
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_separable_matches_reference(seed):
+    params = random_ellipse_params(np.random.default_rng(seed))
+    width, height = animation.canvas_width, animation.canvas_height
+    result = create_irregular_radial_gradient(width, height, params, separable=True)
+    assert_close_to_reference(result, reference_radial(width, height, params))
@@ -0,0 +1,26 @@
+"""
+单精度模式的测试：float32在复用的缓冲区中原地计算，与精确计算只在个别像素上相差1
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import ellipse_animation as animation
+from radial_gradient import create_irregular_radial_gradient
+from test_render_equivalence import random_ellipse_params, reference_radial
+
+
+def assert_close_to_reference(result, expected):
+    """与参考结果至多相差1；最外层椭圆边界上个别因舍入进出mask的像素除外"""
+    difference = np.abs(result.astype(int) - expected)
+    assert difference.max() <= 1 or np.count_nonzero(difference > 1) <= 4
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_float32_matches_reference(seed):
+    params = random_ellipse_params(np.random.default_rng(seed))
+    width, height = animation.canvas_width, animation.canvas_height
+    result = create_irregular_radial_gradient(width, height, params, dtype=np.float32)
+    assert_close_to_reference(result, reference_radial(width, height, params))
@@ -0,0 +1,24 @@
+"""
+图块缓存的测试：整数中心的椭圆贡献从缓存的图块平移放置，结果与参考实现相同
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+
+import ellipse_animation as animation
+from ellipse_data import ellipse_sets
+from radial_gradient import SpriteCache, create_irregular_radial_gradient
+from test_render_equivalence import reference_radial
+
+
+def test_sprites_match_reference():
+    sprites = SpriteCache()
+    width, height = animation.canvas_width, animation.canvas_height
+    # 相邻的组共用部分图块，依次渲染同时检查复用的图块
+    for index in (0, 7, 15, 22, 30, 7):
+        params = animation.build_ellipse_params(ellipse_sets[index])
+        np.testing.assert_array_equal(
+            create_irregular_radial_gradient(width, height, params, sprites=sprites),
+            reference_radial(width, height, params)
+        )
@@ -0,0 +1,21 @@
+"""
+逐环累加模式的测试：临时缓冲区的数量与环数无关，结果与批量计算相同
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from gradient_engine import create_boundary_blend_gradient
+from test_render_equivalence import random_rings, reference_blend
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_streaming_matches_batched(seed):
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(seed))
+    expected = create_boundary_blend_gradient(size, centers, axes, brightnesses)
+    result = create_boundary_blend_gradient(size, centers, axes, brightnesses, streaming=True)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(result, reference_blend(size, centers, axes, brightnesses),
+                               rtol=1e-5, atol=1e-3)
@@ -0,0 +1,33 @@
+"""
+对称计算的测试：只计算对称轴一侧再镜像，结果与完整计算逐像素相同
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import ellipse_animation as animation
+from ellipse_data import ellipse_sets
+from gradient_engine import create_boundary_blend_gradient
+from radial_gradient import create_irregular_radial_gradient
+from test_render_equivalence import random_rings, reference_radial
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_boundary_blend_symmetry_is_exact(seed):
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(seed), symmetric=True)
+    expected = create_boundary_blend_gradient(size, centers, axes, brightnesses, symmetry=False)
+    result = create_boundary_blend_gradient(size, centers, axes, brightnesses, symmetry=True)
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize('index', [0, 15, 30])
+def test_radial_gradient_symmetry_is_exact(index):
+    params = animation.build_ellipse_params(ellipse_sets[index])
+    width, height = animation.canvas_width, animation.canvas_height
+    expected = reference_radial(width, height, params)
+    np.testing.assert_array_equal(create_irregular_radial_gradient(width, height, params), expected)
+    np.testing.assert_array_equal(
+        create_irregular_radial_gradient(width, height, params, symmetry=False), expected
+    )
@@ -0,0 +1,30 @@
+"""
+分块渲染的测试：多线程按图块渲染的结果与整幅渲染相同
+
+运行：
+    python -m pytest -q
+"""
+import numpy as np
+
+import ellipse_animation as animation
+from ellipse_data import ellipse_sets
+from gradient_engine import create_boundary_blend_gradient
+from radial_gradient import create_irregular_radial_gradient
+from test_render_equivalence import random_rings
+from tiled_render import TiledRenderer, render_blend_tiled, render_radial_tiled
+
+
+def test_tiled_rendering_matches_whole():
+    params = animation.build_ellipse_params(ellipse_sets[11])
+    width, height = animation.canvas_width, animation.canvas_height
+    size, centers, axes, brightnesses = random_rings(np.random.default_rng(3))
+    with TiledRenderer(tile_size=(128, 96), workers=2) as renderer:
+        np.testing.assert_array_equal(
+            render_radial_tiled(width, height, params, renderer=renderer),
+            create_irregular_radial_gradient(width, height, params)
+        )
+        np.testing.assert_allclose(
+            render_blend_tiled(size, centers, axes, brightnesses, renderer=renderer),
+            create_boundary_blend_gradient(size, centers, axes, brightnesses),
+            rtol=1e-5, atol=1e-3
+        )
@@ -1,5 +1,8 @@
 import cv2
 import numpy as np
+from gradient_engine import create_boundary_blend_gradient
+from profiling import maybe_profile
+from render_loop import run_event_loop
 
 def create_triple_eccentric_ring_gradient(
     size, 
@@ -24,46 +27,14 @@ def create_triple_eccentric_ring_gradient(
         middle_brightness: 中间圆亮度值 (0-1)
         inner_brightness: 内圆亮度值 (0-1)
     """
-    canvas = np.zeros(size, dtype=np.float32)
-    y, x = np.ogrid[:size[0], :size[1]]
-    
-    # 计算到三个圆心的距离
-    dist_from_outer = np.sqrt((x - outer_center[0])**2 + (y - outer_center[1])**2)
-    dist_from_middle = np.sqrt((x - middle_center[0])**2 + (y - middle_center[1])**2)
-    dist_from_inner = np.sqrt((x - inner_center[0])**2 + (y - inner_center[1])**2)
-    
-    # 定义有效区域：在外圆内，不在内圆内
-    valid_mask = (dist_from_outer <= outer_radius) & (dist_from_inner >= inner_radius)
-    
-    if valid_mask.any():
-        gradient = np.zeros_like(dist_from_outer)
-        
-        # 计算到各个圆边界的距离
-        dist_to_inner = dist_from_inner - inner_radius
-        dist_to_middle = np.abs(dist_from_middle - middle_radius)
-        dist_to_outer = outer_radius - dist_from_outer
-        
-        # 计算总距离和比例
-        total_dist = dist_to_inner + dist_to_middle + dist_to_outer
-        
-        # 在有效区域计算渐变
-        valid_points = valid_mask
-        if valid_points.any():
-            # 计算每个点到三个圆的归一化距离
-            w_inner = dist_to_inner[valid_points] / total_dist[valid_points]
-            w_middle = dist_to_middle[valid_points] / total_dist[valid_points]
-            w_outer = dist_to_outer[valid_points] / total_dist[valid_points]
-            
-            # 使用三个权重进行亮度插值
-            gradient[valid_points] = (
-                inner_brightness * w_inner +
-                middle_brightness * w_middle +
-                outer_brightness * w_outer
-            )
-        
-        canvas[valid_mask] = gradient[valid_mask]
-    
-    return canvas
+    # 按到三个圆边界的像素距离混合亮度
+    return create_boundary_blend_gradient(
+        size,
+        centers=[outer_center, middle_center, inner_center],
+        axes=[outer_radius, middle_radius, inner_radius],
+        brightnesses=[outer_brightness, middle_brightness, inner_brightness],
+        scales=[outer_radius, middle_radius, inner_radius]
+    )
 
 def check_circles_intersection(c1, r1, c2, r2):
     """检查两个圆是否相交
@@ -126,24 +97,19 @@ def draw_frame():
     return ring
 
 def main():
+    if maybe_profile('triple_eccentric_rings', lambda index: draw_frame()):
+        return
+    
     window_name = 'Triple Eccentric Ring'
     cv2.namedWindow(window_name)
     
-    while True:
-        # 绘制帧
-        frame = draw_frame()
-        
-        if frame is None:
-            print("Error: Invalid circle configuration")
-            break
-            
-        # 显示帧
-        cv2.imshow(window_name, frame)
-        
-        # 检查退出
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+    # 绘制帧
+    frame = draw_frame()
+    
+    if frame is None:
+        print("Error: Invalid circle configuration")
+    else:
+        run_event_loop(window_name, lambda: frame)
     
     cv2.destroyAllWindows()
 
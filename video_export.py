@@ -0,0 +1,189 @@
+"""
+把ellipse_animation的动画导出为视频
+
+iter_frames()按位置序列逐帧生成画面（生成器，不保存整个序列），
+VideoEncoder在后台线程中用cv2.VideoWriter编码，两者之间是有界队列：
+渲染与编码并行进行，队列满时渲染等待，内存占用与序列长度无关。
+
+示例：
+    python video_export.py pingpong.mp4 --cycles 2 --fps 30
+    python video_export.py sweep.avi --positions=-15:15:0.125 --fourcc MJPG --no-hud
+"""
+import argparse
+import queue
+import threading
+import time
+from itertools import islice
+
+import cv2
+
+import ellipse_animation as animation
+
+# 默认帧率、编码格式与编码队列的长度
+DEFAULT_FPS = 30
+DEFAULT_FOURCC = 'mp4v'
+DEFAULT_QUEUE_SIZE = 8
+
+# 队列中表示序列结束的标记
+_END = object()
+
+
+def ping_pong(step, start=0.0, direction=-1):
+    """
+    自动移动的位置序列：从start出发每帧移动step，在MOVE_MIN和MOVE_MAX之间往返（无限）
+
+    位置量化到1/AUTO_MOVE_SUBSTEPS，与窗口中的自动移动一致。
+    """
+    position = start
+    while True:
+        yield round(position * animation.AUTO_MOVE_SUBSTEPS) / animation.AUTO_MOVE_SUBSTEPS
+        position, direction = animation.reflect(position + direction * step, direction)
+
+
+def ping_pong_positions(fps=DEFAULT_FPS, cycles=1):
+    """
+    按窗口中自动移动的速度（每MOVE_INTERVAL毫秒一个位置）和帧率生成cycles个完整往返
+
+    与自动移动一样从0出发先向左移动，最后回到0。
+    """
+    step = 1000 / fps / animation.MOVE_INTERVAL
+    span = animation.MOVE_MAX - animation.MOVE_MIN
+    count = int(round(2 * span * cycles / step))
+    return islice(ping_pong(step), count + 1)
+
+
+def parse_positions(text):
+    """解析 "start:stop:step" 形式的位置序列（包含stop）"""
+    start, stop, step = (float(part) for part in text.split(':'))
+    count = int(round((stop - start) / step))
+    return (start + i * step for i in range(count + 1))
+
+
+def iter_frames(positions, hud=True):
+    """
+    逐帧生成ellipse_animation的画面
+
+    每帧直接渲染，不经过窗口的帧缓存：导出的位置一般不会重复，缓存只会占用内存。
+    HUD按自动移动的状态绘制（"Auto Move: ON"），与窗口中的往返播放一致。
+
+    Args:
+        positions: 位置序列，可以是任意可迭代对象（包括无限的生成器）
+        hud: 是否包含HUD；为False时只有渐变
+
+    Yields:
+        BGR uint8画面，每帧都是独立的数组，可以放心地保存或交给其他线程
+    """
+    overlay = animation.build_hud() if hud else None
+    if overlay is not None:
+        overlay.set_text('mode', "Auto Move: ON")
+    for position in positions:
+        ellipse_params = animation.build_ellipse_params(animation.ellipse_set_at(position))
+        frame = cv2.cvtColor(animation.render_ellipse_params(ellipse_params), cv2.COLOR_GRAY2BGR)
+        if overlay is not None:
+            overlay.set_text('index', f"Current Index: {int(round(position))} (Position: {position:.3f})")
+            overlay.composite(frame)
+        yield frame
+
+
+class VideoEncoder:
+    """
+    在后台线程中编码视频帧
+
+    write()把帧放入有界队列，队列满时等待，使渲染速度与编码速度匹配；
+    close()等待剩余的帧编码完成。编码线程中的异常会在write()或close()时抛出。
+
+    Args:
+        path: 输出文件
+        fps: 帧率
+        size: (width, height) 画面尺寸
+        fourcc: 四字符编码格式
+        queue_size: 队列中最多等待编码的帧数
+    """
+
+    def __init__(self, path, fps, size, fourcc=DEFAULT_FOURCC, queue_size=DEFAULT_QUEUE_SIZE):
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"cannot open video writer for {path} with fourcc {fourcc!r}")
+        self.frames = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='video-encoder', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is _END:
+                break
+            if self._error is not None:
+                continue
+            try:
+                self.writer.write(frame)
+                self.frames += 1
+            except Exception as error:
+                self._error = error
+
+    def write(self, frame):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(frame)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_END)
+            self._thread.join()
+        self.writer.release()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_video(path, positions, fps=DEFAULT_FPS, fourcc=DEFAULT_FOURCC, hud=True,
+                 queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    把位置序列对应的画面编码为视频，返回写入的帧数
+
+    Args:
+        path: 输出文件
+        positions: 位置序列
+        fps: 帧率
+        fourcc: 四字符编码格式
+        hud: 是否包含HUD
+        queue_size: 编码队列的长度
+    """
+    size = (animation.canvas_width, animation.canvas_height)
+    with VideoEncoder(path, fps, size, fourcc, queue_size) as encoder:
+        for frame in iter_frames(positions, hud):
+            encoder.write(frame)
+    return encoder.frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把ellipse_animation的动画导出为视频")
+    parser.add_argument('output', help="输出文件，如 out.mp4")
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS, help="帧率")
+    parser.add_argument('--cycles', type=int, default=1, help="自动移动往返的次数")
+    parser.add_argument('--positions', help="改用 start:stop:step 形式的位置序列")
+    parser.add_argument('--fourcc', default=DEFAULT_FOURCC, help="四字符编码格式")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help="编码队列的长度")
+    parser.add_argument('--no-hud', action='store_true', help="不绘制HUD")
+    args = parser.parse_args(argv)
+
+    if args.positions:
+        positions = parse_positions(args.positions)
+    else:
+        positions = ping_pong_positions(args.fps, args.cycles)
+
+    start = time.perf_counter()
+    frames = export_video(args.output, positions, args.fps, args.fourcc, not args.no_hud, args.queue_size)
+    elapsed = time.perf_counter() - start
+    print(f"wrote {frames} frames to {args.output} in {elapsed:.2f}s ({frames / elapsed:.1f} frames/s)")
+
+
+if __name__ == '__main__':
+    main()